@@ -8,14 +8,35 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
 import sys
 import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from utils.database import Database
+from utils.event_cache import EventCache
+from planner.features import timestamp_minutes
+from planner.itinerary import ItineraryPlanner
+from planner.scoring import CandidateTable, NightScorer, TRAVEL_SLACK_MINUTES
+from planner.selection import top_k, top_k_indices
+from planner.venues import VENUES, TRAVEL_ESTIMATOR, KM_PER_MILE
 
-app = FastAPI(title="MOR Night Planner API", version="1.0.0")
+RECOMMENDATION_LIMIT = 10
+
+db = Database()
+events_cache = EventCache(db)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the database pool on startup and close it on shutdown"""
+    with db:
+        db.get_connection()
+        yield
+
+
+app = FastAPI(title="MOR Night Planner API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,8 +46,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-db = Database()
-
 
 class PlanNightRequest(BaseModel):
     date: str
@@ -45,6 +64,11 @@ class PlanNightV2Request(BaseModel):
     dress_code: str = "smart_casual"
     wants_dinner: bool = False
     crowd_preference: str = "no_preference"
+    max_price: Optional[float] = None
+    exclude_tags: List[str] = []
+    itinerary: bool = False
+    max_stops: int = 3
+    budget: Optional[float] = None
 
 
 class Event(BaseModel):
@@ -87,7 +111,7 @@ def get_events(date: Optional[str] = Query(None, description="Date in YYYY-MM-DD
     Returns events grouped by time window.
     """
     try:
-        events = db.get_events(date=date)
+        events = events_cache.get_events(date=date)
         
         time_windows = {
             "early_evening": [],
@@ -129,7 +153,7 @@ def plan_night(request: PlanNightRequest):
     Uses rules-based heuristics to create a progression through the night.
     """
     try:
-        events = db.get_events(date=request.date)
+        events = events_cache.get_events(date=request.date)
         
         if not events:
             raise HTTPException(
@@ -146,6 +170,10 @@ def plan_night(request: PlanNightRequest):
         
         preferred_windows = mood_mapping.get(request.mood, ["prime_time", "late_night"])
         
+        within_radius = VENUES.radius_filter(request.starting_location, request.walking_radius * KM_PER_MILE)
+        if within_radius:
+            events = [event for event in events if within_radius(event)]
+        
         itinerary = []
         
         for event in events[:10]:
@@ -177,13 +205,11 @@ def plan_night(request: PlanNightRequest):
             except:
                 continue
         
-        itinerary.sort(key=lambda x: x['time'])
-        
         return {
             "date": request.date,
             "starting_location": request.starting_location,
             "mood": request.mood,
-            "itinerary": itinerary[:5],
+            "itinerary": top_k(itinerary, 5, key=lambda x: x['time'], largest=False),
             "total_events": len(itinerary),
             "message": f"Your {request.mood} night plan for {request.date}"
         }
@@ -201,10 +227,53 @@ def plan_night_v2(request: PlanNightV2Request):
     Uses heuristics based on energy level, travel time, crowd preference, and other factors.
     """
     try:
-        events = db.get_events(date=request.date)
+        def candidate_filters():
+            """Translate the request into SQL-side constraints for Database.get_candidate_events"""
+            filters = TRAVEL_ESTIMATOR.neighborhood_filter(
+                request.home_base, request.max_travel_minutes + TRAVEL_SLACK_MINUTES
+            )
+            filters.update(max_price=request.max_price, exclude_tags=request.exclude_tags)
+            
+            window_start = datetime.fromisoformat(f"{request.date}T{request.start_time}")
+            window_end = datetime.fromisoformat(f"{request.date}T{request.end_time}")
+            if window_end <= window_start:
+                window_end += timedelta(days=1)
+            
+            return window_start, window_end + timedelta(minutes=1), filters
         
-        if not events:
-            return {
+        def cached_candidates(start, end, **filters):
+            key = ('candidates', start.isoformat(), end.isoformat()) + tuple(
+                (name, tuple(value) if isinstance(value, list) else value)
+                for name, value in sorted(filters.items())
+            )
+            return events_cache.get(
+                key, lambda: CandidateTable(db.get_candidate_events(start, end, **filters), locate=VENUES.coordinates)
+            )
+        
+        # A malformed date matches no events rather than failing the request
+        try:
+            day = datetime.fromisoformat(request.date)
+        except ValueError:
+            day = None
+        
+        try:
+            window_start, window_end, filters = candidate_filters()
+            candidates = cached_candidates(window_start, window_end, **filters)
+        except ValueError:
+            window_start = window_end = None
+            candidates = []
+        
+        # Sparse days: relax travel and time window, which the scorer only penalizes,
+        # so there is still a full list to rank
+        if day is not None and len(candidates) < RECOMMENDATION_LIMIT:
+            candidates = cached_candidates(
+                day, day + timedelta(days=1),
+                max_price=request.max_price,
+                exclude_tags=request.exclude_tags
+            )
+        
+        if not candidates:
+            response = {
                 "date": request.date,
                 "home_base": request.home_base,
                 "max_travel_minutes": request.max_travel_minutes,
@@ -212,136 +281,24 @@ def plan_night_v2(request: PlanNightV2Request):
                 "wants_dinner": request.wants_dinner,
                 "recommendations": []
             }
+            if request.itinerary:
+                response.update(itinerary=[], itinerary_complete=True)
+            return response
         
-        neighborhood_distances = {
-            'harlem': {'harlem': 0, 'upper west side': 15, 'upper east side': 20, 'midtown': 25, 
-                      'chelsea': 35, 'east village': 40, 'lower east side': 45, 'brooklyn': 50, 'bushwick': 60},
-            'upper west side': {'upper west side': 0, 'harlem': 15, 'midtown': 15, 'upper east side': 20,
-                               'chelsea': 25, 'east village': 35, 'lower east side': 40, 'brooklyn': 45, 'bushwick': 55},
-            'upper east side': {'upper east side': 0, 'harlem': 20, 'midtown': 15, 'upper west side': 20,
-                               'chelsea': 30, 'east village': 25, 'lower east side': 30, 'brooklyn': 40, 'bushwick': 50},
-            'midtown': {'midtown': 0, 'upper west side': 15, 'upper east side': 15, 'chelsea': 10,
-                       'east village': 20, 'lower east side': 25, 'brooklyn': 35, 'bushwick': 45, 'harlem': 25},
-            'chelsea': {'chelsea': 0, 'midtown': 10, 'east village': 15, 'west village': 10, 'soho': 15,
-                       'lower east side': 20, 'brooklyn': 30, 'bushwick': 40, 'harlem': 35},
-            'east village': {'east village': 0, 'lower east side': 10, 'chelsea': 15, 'midtown': 20,
-                            'brooklyn': 25, 'bushwick': 35, 'williamsburg': 20, 'harlem': 40},
-            'lower east side': {'lower east side': 0, 'east village': 10, 'soho': 15, 'brooklyn': 20,
-                               'williamsburg': 15, 'bushwick': 30, 'chelsea': 20, 'harlem': 45},
-            'brooklyn': {'brooklyn': 0, 'bushwick': 15, 'williamsburg': 10, 'lower east side': 20,
-                        'east village': 25, 'chelsea': 30, 'midtown': 35, 'harlem': 50},
-            'bushwick': {'bushwick': 0, 'williamsburg': 10, 'brooklyn': 15, 'lower east side': 30,
-                        'east village': 35, 'chelsea': 40, 'midtown': 45, 'harlem': 60},
-            'williamsburg': {'williamsburg': 0, 'bushwick': 10, 'brooklyn': 10, 'lower east side': 15,
-                            'east village': 20, 'chelsea': 30, 'midtown': 35, 'harlem': 50},
-        }
-        
-        venues_30_plus = ['house of yes', 'slipper room', 'jazz standard', 'blue note', 'village vanguard']
-        
-        intense_keywords = ['edm', 'rave', 'techno', 'bass', 'warehouse', 'club', 'dj']
-        seated_keywords = ['dinner', 'show', 'theater', 'burlesque', 'comedy', 'jazz', 'seated']
-        
-        def calculate_travel_time(home_base_lower, event_neighborhood_lower):
-            if not event_neighborhood_lower or event_neighborhood_lower == 'tbd':
-                return 30
-            
-            if home_base_lower in neighborhood_distances and event_neighborhood_lower in neighborhood_distances[home_base_lower]:
-                return neighborhood_distances[home_base_lower][event_neighborhood_lower]
-            
-            return 35
-        
-        def score_event(event):
-            score = 50.0
-            reasons = []
-            
-            event_neighborhood = (event.get('neighborhood') or '').lower()
-            home_base_lower = request.home_base.lower()
-            
-            travel_time = calculate_travel_time(home_base_lower, event_neighborhood)
-            
-            if travel_time <= request.max_travel_minutes:
-                score += 20
-                reasons.append(f"within {request.max_travel_minutes} min travel")
-            elif travel_time <= request.max_travel_minutes + 15:
-                score += 10
-                reasons.append(f"slightly outside travel range ({travel_time} min)")
-            else:
-                score -= 20
-                reasons.append(f"far from home base ({travel_time} min)")
-            
-            title_lower = (event.get('title') or '').lower()
-            desc_lower = (event.get('description') or '').lower()
-            tags = event.get('raw_tags') or []
-            tags_lower = [t.lower() for t in tags]
-            
-            is_intense = any(kw in title_lower or kw in desc_lower or kw in tags_lower for kw in intense_keywords)
-            is_seated = any(kw in title_lower or kw in desc_lower or kw in tags_lower for kw in seated_keywords)
-            
-            if request.energy_level == 'low':
-                if is_seated:
-                    score += 25
-                    reasons.append("seated/show style (good for low energy)")
-                if is_intense:
-                    score -= 30
-                    reasons.append("too intense for low energy")
-                if request.wants_dinner and is_seated:
-                    score += 15
-                    reasons.append("dinner-friendly")
-            elif request.energy_level == 'medium':
-                if is_seated:
-                    score += 10
-                    reasons.append("good mix of seated and standing")
-                if is_intense:
-                    score -= 10
-            elif request.energy_level == 'high':
-                if is_intense:
-                    score += 25
-                    reasons.append("high energy event")
-                if is_seated:
-                    score -= 15
-                    reasons.append("too seated for high energy")
-            
-            venue_lower = (event.get('venue_name') or '').lower()
-            if request.crowd_preference == '30_plus_preferred':
-                if any(v in venue_lower for v in venues_30_plus):
-                    score += 20
-                    reasons.append("known for 30+ crowd")
-                elif 'college' in title_lower or 'student' in title_lower:
-                    score -= 20
-                    reasons.append("younger crowd")
-            
-            start_time_str = event.get('start_datetime', '')
-            try:
-                event_dt = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                event_time = event_dt.strftime('%H:%M')
-                
-                if request.start_time <= event_time <= request.end_time:
-                    score += 15
-                    reasons.append("within your time window")
-                else:
-                    score -= 10
-            except:
-                pass
-            
-            price_min = event.get('price_min')
-            if price_min is not None:
-                if price_min == 0:
-                    score += 5
-                    reasons.append("free event")
-                elif price_min < 20:
-                    score += 3
-            
-            return score, reasons
-        
-        scored_events = []
-        for event in events:
-            score, reasons = score_event(event)
-            scored_events.append((score, event, reasons))
-        
-        scored_events.sort(key=lambda x: x[0], reverse=True)
-        
+        scorer = NightScorer(
+            estimate_travel=lambda table: TRAVEL_ESTIMATOR.from_origin(request.home_base, table),
+            max_travel_minutes=request.max_travel_minutes,
+            energy_level=request.energy_level,
+            wants_dinner=request.wants_dinner,
+            crowd_preference=request.crowd_preference,
+            start_time=request.start_time,
+            end_time=request.end_time
+        )
+        scores = scorer.score(candidates)
         recommendations = []
-        for score, event, reasons in scored_events[:10]:
+        for index in top_k_indices(scores, RECOMMENDATION_LIMIT):
+            event = candidates.events[index]
+            reasons = scorer.reasons(candidates, index)
             try:
                 start_datetime_str = event.get('start_datetime', '')
                 event_dt = datetime.fromisoformat(start_datetime_str.replace('Z', '+00:00'))
@@ -363,7 +320,7 @@ def plan_night_v2(request: PlanNightV2Request):
             except Exception as e:
                 continue
         
-        return {
+        response = {
             "date": request.date,
             "home_base": request.home_base,
             "max_travel_minutes": request.max_travel_minutes,
@@ -371,6 +328,36 @@ def plan_night_v2(request: PlanNightV2Request):
             "wants_dinner": request.wants_dinner,
             "recommendations": recommendations
         }
+        
+        if request.itinerary:
+            planner = ItineraryPlanner(
+                travel_between=TRAVEL_ESTIMATOR.between,
+                max_stops=request.max_stops,
+                max_leg_minutes=request.max_travel_minutes + TRAVEL_SLACK_MINUTES,
+                budget=request.budget
+            )
+            plan = planner.plan(
+                candidates, scores, scorer.travel_minutes(candidates),
+                window_start=timestamp_minutes(window_start) if window_start else None,
+                window_end=timestamp_minutes(window_end) if window_end else None
+            )
+            itinerary = []
+            for index, leg in zip(plan.stops, plan.legs):
+                event = candidates.events[index]
+                itinerary.append({
+                    "title": event.get('title'),
+                    "start_datetime": event.get('start_datetime'),
+                    "end_datetime": event.get('end_datetime'),
+                    "venue_name": event.get('venue_name'),
+                    "neighborhood": event.get('neighborhood'),
+                    "price_min": event.get('price_min'),
+                    "url": event.get('url'),
+                    "travel_minutes": leg
+                })
+            response["itinerary"] = itinerary
+            response["itinerary_complete"] = plan.complete
+        
+        return response
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -382,7 +369,8 @@ def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "database_events": db.get_event_count()
+        "database_events": db.get_event_count(),
+        "events_cache": events_cache.stats()
     }
 
 
@@ -0,0 +1,91 @@
+"""
+Per-source crawl state for incremental pipeline runs.
+
+Every event a source lists is recorded in source_listings, stamped with the
+run that saw it. Paged scrapers stop at the first page holding only listings
+an earlier run already recorded, so a run only walks as far as the listing
+changed. Every FULL_CRAWL_INTERVAL a source is walked to the end instead, and
+only a complete crawl tombstones the events the source stopped listing.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List
+
+from utils.database import Database, event_fingerprint
+
+# Longest a source goes without a crawl to the end of its listing
+FULL_CRAWL_INTERVAL = timedelta(hours=24)
+
+# Listings buffered per source before their last_seen stamps are written
+SEEN_BATCH_SIZE = 500
+
+
+class CrawlTracker:
+    """Crawl bookkeeping for one pipeline run"""
+    
+    def __init__(self, db: Database, full_crawl_interval: timedelta = FULL_CRAWL_INTERVAL):
+        self.db = db
+        self.full_crawl_interval = full_crawl_interval
+        self.started_at = datetime.now().isoformat()
+        self.pending: Dict[str, List[Dict[str, Any]]] = {}
+    
+    def needs_full_crawl(self, source: str) -> bool:
+        """Whether source is due a walk to the end of its listing"""
+        state = self.db.get_crawl_state(source)
+        if not state or not state['last_full_crawl_at']:
+            return True
+        last_full = datetime.fromisoformat(state['last_full_crawl_at'])
+        return datetime.fromisoformat(self.started_at) - last_full >= self.full_crawl_interval
+    
+    def page_is_known(self, source: str, events: List[Dict[str, Any]]) -> bool:
+        """True if an earlier crawl of source already listed every event on a page"""
+        fingerprints = {event_fingerprint(event) for event in events}
+        return bool(fingerprints) and self.db.known_listings(source, events) == fingerprints
+    
+    def prepare(self, scrapers: List[Any]):
+        """Let scrapers that are not due a full crawl stop paging at known pages"""
+        for scraper in scrapers:
+            if not hasattr(scraper, 'known_page'):
+                continue
+            if self.needs_full_crawl(scraper.source_name):
+                scraper.known_page = None
+                print(f"  {scraper.source_name}: full crawl")
+            else:
+                scraper.known_page = lambda events, source=scraper.source_name: self.page_is_known(source, events)
+    
+    def observe(self, events: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Pass a stream of scraped events through, recording each as seen by its source"""
+        for event in events:
+            source = event.get('source_platform') or 'unknown'
+            pending = self.pending.setdefault(source, [])
+            pending.append(event)
+            if len(pending) >= SEEN_BATCH_SIZE:
+                self.flush(source)
+            yield event
+    
+    def flush(self, source: str):
+        """Write buffered last_seen stamps for a source"""
+        pending = self.pending.pop(source, [])
+        if pending:
+            self.db.mark_listings_seen(source, pending, self.started_at)
+    
+    def finish(self, scrapers: List[Any], results: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Record each scraper's crawl and tombstone what complete crawls no longer
+        list. results are stream_events results, in scraper order. Returns the
+        number of events tombstoned per source.
+        """
+        for source in list(self.pending):
+            self.flush(source)
+        
+        removed = {}
+        for scraper, result in zip(scrapers, results):
+            success = result['error'] is None
+            complete = success and getattr(scraper, 'crawl_complete', False)
+            removed[scraper.source_name] = self.db.finish_crawl(
+                scraper.source_name, self.started_at, success, complete, result['count']
+            )
+            if hasattr(scraper, 'known_page'):
+                scraper.known_page = None
+        
+        return removed
@@ -0,0 +1,291 @@
+"""
+Fuzzy cross-platform deduplication.
+
+The same night is often listed on several platforms under slightly different
+titles ("House of Yes: Cosmic Disco" vs "Cosmic Disco" with venue TBD), which
+the exact (title, date, venue) key in run_scrape misses. Events are only
+compared within blocks sharing a date and a venue, and within a block only
+with events whose MinHash signatures collide in at least one LSH band, so the
+work per event stays roughly constant as sources are added. Listings without
+a known venue and neighborhood (a scraper's default counts as unknown) are
+compared with every listing that day instead. Candidates are confirmed by the
+Jaccard similarity of their title shingles.
+"""
+
+import re
+import threading
+import unicodedata
+import zlib
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from scraper.engine import DEFAULT_NEIGHBORHOOD
+
+# Jaccard similarity of title shingles at or above which two listings are one event
+SIMILARITY_THRESHOLD = 0.6
+
+# MinHash signature length, split into LSH bands of NUM_PERM // LSH_BANDS rows.
+# 16 bands of 2 rows make pairs at the threshold candidates with ~99.9% probability.
+NUM_PERM = 32
+LSH_BANDS = 16
+MINHASH_SEED = 7
+MINHASH_PRIME = (1 << 31) - 1
+
+SHINGLE_SIZE = 3
+
+# Venue values that say nothing about where an event is
+UNKNOWN_VENUES = {'', 'tbd', 'tba', 'new york', 'secret location'}
+
+# Neighborhood values scrapers fall back to when a location names none
+UNKNOWN_NEIGHBORHOODS = {'', 'tbd', 'tba', DEFAULT_NEIGHBORHOOD.lower()}
+
+# Filler words dropped from titles before shingling
+TITLE_STOPWORDS = {'the', 'a', 'an', 'at', 'with', 'w', 'presents', 'feat', 'ft'}
+
+NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = text.encode('ascii', 'ignore').decode('ascii').lower()
+    return NON_WORD_RE.sub(' ', text).strip()
+
+
+def normalize_venue(venue_name: Optional[str]) -> str:
+    """Normalized venue name, or '' when the venue is unknown"""
+    venue = normalize_text(venue_name)
+    if venue.startswith('the '):
+        venue = venue[4:]
+    return '' if venue in UNKNOWN_VENUES else venue
+
+
+def normalize_title(title: Optional[str], venue: str = '') -> str:
+    """Title words without filler or the event's own venue name"""
+    normalized = normalize_text(title)
+    if venue:
+        normalized = f' {normalized} '.replace(f' {venue} ', ' ').strip()
+    words = [word for word in normalized.split() if word not in TITLE_STOPWORDS]
+    return ' '.join(words) or normalize_text(title)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> FrozenSet[str]:
+    """Character shingles of a normalized title"""
+    if len(text) <= size:
+        return frozenset([text])
+    return frozenset(text[i:i + size] for i in range(len(text) - size + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two shingle sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class Listing(NamedTuple):
+    """What the deduplicator keeps about a canonical event"""
+    source_platform: str
+    url: Optional[str]
+    title: str
+    venue: str
+    shingles: FrozenSet[str]
+    numbers: FrozenSet[str]
+    date: str
+
+
+class FuzzyDeduplicator:
+    """
+    Incremental fuzzy deduplicator. add() each event in preference order; an
+    event matching an earlier one is reported as its duplicate, so the first
+    listing seen becomes the canonical event. Only signatures and shingles of
+    canonical events are kept, never the events themselves.
+    
+    Only listings from other sources count as duplicates. A source listing an
+    event again, as it does on every run, maps back to its own earlier listing
+    and passes through, so changes to it still reach the database.
+    
+    add() may be called from several threads, so one deduplicator can span
+    pipeline runs; prune() drops listings whose date has passed.
+    """
+    
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, num_perm: int = NUM_PERM,
+                 bands: int = LSH_BANDS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        
+        rng = np.random.default_rng(MINHASH_SEED)
+        self._a = rng.integers(1, MINHASH_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MINHASH_PRIME, num_perm, dtype=np.uint64)
+        
+        self.listings: Dict[int, Listing] = {}
+        self.merged: List[Dict[str, Any]] = []
+        self._buckets: Dict[Tuple, List[int]] = {}
+        # (source_platform, date, venue, normalized title) -> index of that source's listing
+        self._own: Dict[Tuple[str, str, str, str], int] = {}
+        self._next_index = 0
+        self._lock = threading.Lock()
+    
+    def signature(self, shingle_set: FrozenSet[str]) -> np.ndarray:
+        """MinHash signature of a shingle set"""
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) % MINHASH_PRIME for s in shingle_set),
+                             dtype=np.uint64, count=len(shingle_set))
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % MINHASH_PRIME).min(axis=1)
+    
+    def band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        """One bucket key per LSH band"""
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(self.bands)]
+    
+    @staticmethod
+    def event_date(event: Dict[str, Any]) -> str:
+        """YYYY-MM-DD part of an event's start"""
+        start_datetime = event.get('start_datetime') or ''
+        return start_datetime.split('T')[0] if 'T' in start_datetime else start_datetime[:10]
+    
+    @classmethod
+    def blocks(cls, event: Dict[str, Any], venue: str) -> Tuple[List[Tuple], List[Tuple]]:
+        """
+        Blocking keys as (keys to look up, keys to index under). Placed events,
+        with a known venue and neighborhood, share a block by date and venue.
+        Unplaced ones are looked up against the whole date, and placed ones
+        against that date's unplaced events too.
+        """
+        date_part = cls.event_date(event)
+        neighborhood = normalize_text(event.get('neighborhood'))
+        
+        day = (date_part, 'day')
+        unplaced = (date_part, 'unplaced')
+        if not venue or neighborhood in UNKNOWN_NEIGHBORHOODS:
+            return [day], [day, unplaced]
+        
+        block = (date_part, 'venue', venue)
+        return [block, unplaced], [block, day]
+    
+    def match(self, listing: Listing, keys: List[Tuple]) -> Optional[int]:
+        """Index of the most similar earlier listing at or above the threshold"""
+        best, best_score = None, 0.0
+        seen = set()
+        
+        for key in keys:
+            for candidate in self._buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                
+                other = self.listings[candidate]
+                if other.source_platform == listing.source_platform:
+                    continue
+                if listing.venue and other.venue and listing.venue != other.venue:
+                    continue
+                if listing.numbers != other.numbers:
+                    # "Vol. 3" and "Vol. 4" read alike but are different nights
+                    continue
+                score = jaccard(listing.shingles, other.shingles)
+                if score < self.threshold:
+                    continue
+                if best is None or score > best_score or (score == best_score and candidate < best):
+                    best, best_score = candidate, score
+        
+        return best
+    
+    def add(self, event: Dict[str, Any]) -> Optional[int]:
+        """
+        Index an event. Returns the index in listings of the canonical event it
+        duplicates, or None if it is new and becomes canonical itself, or is
+        its source's own earlier listing.
+        """
+        index, duplicate = self.add_listing(event)
+        return index if duplicate else None
+    
+    def add_listing(self, event: Dict[str, Any]) -> Tuple[int, bool]:
+        """
+        Index an event. Returns the index in listings it now maps to, and whether
+        that is another source's listing it duplicates.
+        """
+        venue = normalize_venue(event.get('venue_name'))
+        title = normalize_title(event.get('title'), venue)
+        listing = Listing(event.get('source_platform') or 'unknown', event.get('url'),
+                          event.get('title') or '', venue, shingles(title),
+                          frozenset(word for word in title.split() if word.isdigit()),
+                          self.event_date(event))
+        
+        bands = self.band_keys(self.signature(listing.shingles))
+        lookup, indexed = self.blocks(event, venue)
+        
+        own_key = (listing.source_platform, listing.date, venue, title)
+        
+        with self._lock:
+            index = self._own.get(own_key)
+            if index is not None:
+                return index, False
+            
+            index = self.match(listing, [block + band for block in lookup for band in bands])
+            if index is not None:
+                canonical = self.listings[index]
+                self.merged.append({
+                    'source_platform': listing.source_platform,
+                    'url': listing.url,
+                    'title': listing.title,
+                    'canonical_source': canonical.source_platform,
+                    'canonical_url': canonical.url,
+                    'canonical_title': canonical.title
+                })
+                return index, True
+            
+            index = self._next_index
+            self._next_index += 1
+            self.listings[index] = listing
+            self._own[own_key] = index
+            for key in (block + band for block in indexed for band in bands):
+                self._buckets.setdefault(key, []).append(index)
+            return index, False
+    
+    def prune(self, before: str) -> int:
+        """
+        Forget listings dated before the YYYY-MM-DD date before, and the merges
+        reported so far. Returns the number of listings dropped.
+        """
+        with self._lock:
+            stale = [index for index, listing in self.listings.items() if listing.date < before]
+            for index in stale:
+                del self.listings[index]
+            self._own = {key: index for key, index in self._own.items() if index in self.listings}
+            self._buckets = {key: indices for key, indices in self._buckets.items() if key[0] >= before}
+            self.merged = []
+            return len(stale)
+
+
+class DedupResult(NamedTuple):
+    """Canonical events plus, for every input event, the index of its canonical event"""
+    events: List[Dict[str, Any]]
+    canonical: List[int]
+    merged: List[Dict[str, Any]]
+
+
+def fuzzy_deduplicate(events: Iterable[Dict[str, Any]],
+                      threshold: float = SIMILARITY_THRESHOLD) -> DedupResult:
+    """
+    Collapse listings of the same event across platforms, keeping the first
+    copy. merged maps each dropped listing (source, url, title) to the
+    canonical one it was folded into.
+    """
+    deduplicator = FuzzyDeduplicator(threshold)
+    unique_events = []
+    canonical = []
+    # listing index -> position of its event in unique_events
+    positions = {}
+    
+    for event in events:
+        index, _ = deduplicator.add_listing(event)
+        if index not in positions:
+            unique_events.append(event)
+            positions[index] = len(unique_events) - 1
+        canonical.append(positions[index])
+    
+    return DedupResult(unique_events, canonical, deduplicator.merged)
@@ -5,8 +5,13 @@ Pipeline script to run all scrapers, deduplicate events, and store in database.
 
 import sys
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
@@ -19,46 +24,84 @@ from scraper import (
     ShotgunScraper,
     ViewcyScraper
 )
-from utils.database import Database
+from scraper.parsing import ParserPool
+from pipeline.crawl_state import CrawlTracker
+from pipeline.dedup import FuzzyDeduplicator
+from utils.database import Database, event_fingerprint, event_identity
 
+# Longest a single scraper may run before its results are abandoned
+SCRAPER_TIMEOUT_SECONDS = 60.0
 
-def deduplicate_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+# Parser processes for a pipeline run; 0 parses in the fetching threads
+PARSE_WORKERS = os.cpu_count() or 1
+
+# Streaming runs: events buffered between scrapers and the writer, rows per
+# database write, and the longest a partial batch waits before it is written
+STREAM_QUEUE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+STREAM_FLUSH_SECONDS = 2.0
+STREAM_POLL_SECONDS = 0.1
+
+
+def dedup_key(event: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Events sharing a title, start date and venue are the same event"""
+    return event_identity(event)
+
+
+def deduplicate_stream(events: Iterable[Dict[str, Any]],
+                       seen: Optional[Set[Tuple[str, str, str]]] = None,
+                       fuzzy: Optional[FuzzyDeduplicator] = None) -> Iterator[Dict[str, Any]]:
     """
-    Deduplicate events based on title, start_datetime, and venue_name.
-    This allows cross-platform deduplication when the same event appears on multiple sources.
+    Yield the first copy of each event and skip later duplicates.
+    Exact (title, date, venue) repeats are dropped first; with fuzzy, events that
+    survive are also matched against near-identical listings from other platforms.
+    Only the keys and signatures seen so far are kept, not the events themselves.
     """
-    seen = set()
-    unique_events = []
+    seen = set() if seen is None else seen
     
     for event in events:
-        title_normalized = event.get('title', '').lower().strip()
-        
-        start_datetime = event.get('start_datetime', '')
-        date_part = start_datetime.split('T')[0] if 'T' in start_datetime else start_datetime[:10]
+        key = dedup_key(event)
         
-        venue_normalized = event.get('venue_name', '').lower().strip()
+        if key in seen:
+            print(f"  Skipping duplicate: {event.get('title')} at {event.get('venue_name')} on {key[1]}")
+            continue
+        seen.add(key)
         
-        key = (title_normalized, date_part, venue_normalized)
+        if fuzzy is not None:
+            canonical = fuzzy.add(event)
+            if canonical is not None:
+                listing = fuzzy.listings[canonical]
+                print(f"  Skipping near-duplicate: {event.get('title')} ({event.get('source_platform')}) "
+                      f"is {listing.title} ({listing.source_platform}) on {key[1]}")
+                continue
         
-        if key not in seen:
-            seen.add(key)
-            unique_events.append(event)
-        else:
-            print(f"  Skipping duplicate: {event.get('title')} at {event.get('venue_name')} on {date_part}")
-    
-    return unique_events
+        yield event
 
 
-def run_all_scrapers() -> List[Dict[str, Any]]:
+def deduplicate_events(events: List[Dict[str, Any]], fuzzy: bool = True) -> List[Dict[str, Any]]:
     """
-    Run all scrapers and collect events.
+    Deduplicate events based on title, start_datetime, and venue_name.
+    This allows cross-platform deduplication when the same event appears on multiple sources.
+    With fuzzy, listings whose titles are near-identical on the same date and venue
+    (or just the same date, when a venue or neighborhood is unknown) are merged too.
     """
-    print("Starting scraper pipeline...")
-    print("-" * 50)
-    
-    all_events = []
+    return list(deduplicate_stream(events, fuzzy=FuzzyDeduplicator() if fuzzy else None))
+
+
+def report_merged(fuzzy: FuzzyDeduplicator):
+    """Print the source -> canonical listing mapping of a fuzzy dedup pass"""
+    if not fuzzy.merged:
+        return
     
-    scrapers = [
+    print(f"Merged {len(fuzzy.merged)} cross-platform listings:")
+    for row in fuzzy.merged:
+        print(f"  {row['source_platform']}: {row['url'] or row['title']} -> "
+              f"{row['canonical_source']}: {row['canonical_url'] or row['canonical_title']}")
+
+
+def default_scrapers() -> List[Any]:
+    """The scrapers a pipeline run uses, in merge order"""
+    return [
         HouseOfYesScraper(),
         SlipperRoomScraper(),
         EventbriteScraper(),
@@ -67,24 +110,350 @@ def run_all_scrapers() -> List[Dict[str, Any]]:
         PoshScraper(),
         InstagramScraper()
     ]
+
+
+def scrape_concurrently(scrapers: List[Any], max_workers: Optional[int] = None,
+                        timeout: float = SCRAPER_TIMEOUT_SECONDS) -> List[Dict[str, Any]]:
+    """
+    Run scrapers on a thread pool and return one result per scraper, in input order:
+    {'source', 'events', 'error', 'elapsed'}. A scraper still running timeout seconds
+    after it started is reported as timed out and its thread is left to finish on its own.
+    """
+    results = [None] * len(scrapers)
+    started = {}
+    
+    def run(index, scraper):
+        started[index] = time.monotonic()
+        return scraper.scrape()
+    
+    def record(index, events=None, error=None):
+        elapsed = time.monotonic() - started.get(index, time.monotonic())
+        results[index] = {
+            'source': scrapers[index].source_name,
+            'events': events or [],
+            'error': error,
+            'elapsed': elapsed
+        }
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers or max(1, len(scrapers)),
+                                  thread_name_prefix='scraper')
+    try:
+        futures = {executor.submit(run, i, scraper): i for i, scraper in enumerate(scrapers)}
+        pending = set(futures)
+        
+        while pending:
+            done, pending = wait(pending, timeout=_next_deadline(pending, futures, started, timeout),
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    record(futures[future], events=future.result())
+                except Exception as e:
+                    record(futures[future], error=str(e))
+            
+            now = time.monotonic()
+            for future in list(pending):
+                index = futures[future]
+                if index in started and now - started[index] >= timeout:
+                    record(index, error=f"timed out after {timeout:.0f}s")
+                    pending.discard(future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return results
+
+
+def _next_deadline(pending, futures, started, timeout: float) -> float:
+    """Seconds until the earliest running scraper hits its deadline"""
+    deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+    if not deadlines:
+        return timeout
+    return max(0.0, min(deadlines) - time.monotonic())
+
+
+@contextmanager
+def parser_pool_for(scrapers: List[Any], parse_workers: int):
+    """Lend scrapers a warmed parser pool for the duration of a run (none if parse_workers is 0)"""
+    if not parse_workers:
+        yield None
+        return
     
-    for scraper in scrapers:
-        print(f"\nRunning {scraper.source_name} scraper...")
+    with ParserPool(parse_workers) as pool:
+        print(f"Started {pool.warm()} parser workers")
+        for scraper in scrapers:
+            if hasattr(scraper, 'parser_pool'):
+                scraper.parser_pool = pool
         try:
-            events = scraper.scrape()
-            print(f"  Found {len(events)} events from {scraper.source_name}")
-            all_events.extend(events)
-        except Exception as e:
-            print(f"  Error running {scraper.source_name} scraper: {e}")
+            yield pool
+        finally:
+            for scraper in scrapers:
+                if hasattr(scraper, 'parser_pool'):
+                    scraper.parser_pool = None
+
+
+def run_all_scrapers(scrapers: Optional[List[Any]] = None, max_workers: Optional[int] = None,
+                     timeout: float = SCRAPER_TIMEOUT_SECONDS, parse_workers: int = 0) -> List[Dict[str, Any]]:
+    """
+    Run all scrapers concurrently and collect events.
+    Scraper threads only fetch; with parse_workers, pages are parsed in a
+    process pool warmed before fetching starts. Events are merged in scraper
+    order, so deduplication keeps the same copy every run.
+    """
+    print("Starting scraper pipeline...")
+    print("-" * 50)
+    
+    if scrapers is None:
+        scrapers = default_scrapers()
+    
+    with parser_pool_for(scrapers, parse_workers):
+        results = scrape_concurrently(scrapers, max_workers=max_workers, timeout=timeout)
+    
+    all_events = []
+    
+    for result in results:
+        if result['error']:
+            print(f"  Error running {result['source']} scraper: {result['error']}")
+        else:
+            print(f"  Found {len(result['events'])} events from {result['source']} "
+                  f"in {result['elapsed']:.1f}s")
+        all_events.extend(result['events'])
     
     print(f"\nTotal events collected: {len(all_events)}")
     
-    unique_events = deduplicate_events(all_events)
+    fuzzy = FuzzyDeduplicator()
+    unique_events = list(deduplicate_stream(all_events, fuzzy=fuzzy))
     print(f"Unique events after deduplication: {len(unique_events)}")
+    report_merged(fuzzy)
     
     return unique_events
 
 
+def stream_events(scrapers: List[Any], max_workers: Optional[int] = None,
+                  timeout: float = SCRAPER_TIMEOUT_SECONDS, queue_size: int = STREAM_QUEUE_SIZE,
+                  results: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Run scrapers on a thread pool and yield their events as they are scraped,
+    in arrival order. Scraper threads hand events over through a queue of at
+    most queue_size events and block when it is full, so a slow consumer slows
+    the scrapers down instead of letting events pile up in memory.
+    
+    Time a scraper spends blocked on the queue does not count toward its timeout.
+    If results is given it is filled with one {'source', 'count', 'error', 'elapsed',
+    'future'} per scraper, in input order, once the stream is exhausted. 'future'
+    is the scraper's thread, which a timed-out scraper can outlive the stream on.
+    """
+    handoff = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    started = {}
+    finished = {}
+    futures = []
+    
+    def put(item) -> bool:
+        waited_from = time.monotonic()
+        while not stop.is_set():
+            try:
+                handoff.put(item, timeout=STREAM_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+            finally:
+                started[item[1]] += time.monotonic() - waited_from
+                waited_from = time.monotonic()
+        return False
+    
+    def run(index, scraper):
+        started[index] = time.monotonic()
+        count, error = 0, None
+        try:
+            events = scraper.iter_events() if hasattr(scraper, 'iter_events') else scraper.scrape()
+            for event in events:
+                if not put(('event', index, event)):
+                    return
+                count += 1
+        except Exception as e:
+            error = str(e)
+        put(('done', index, {'count': count, 'error': error}))
+    
+    def record(index, count=0, error=None):
+        finished[index] = {
+            'source': scrapers[index].source_name,
+            'count': count,
+            'error': error,
+            'elapsed': time.monotonic() - started.get(index, time.monotonic()),
+            'future': futures[index]
+        }
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers or max(1, len(scrapers)),
+                                  thread_name_prefix='scraper')
+    try:
+        for index, scraper in enumerate(scrapers):
+            futures.append(executor.submit(run, index, scraper))
+        
+        while len(finished) < len(scrapers):
+            try:
+                kind, index, payload = handoff.get(timeout=STREAM_POLL_SECONDS)
+            except queue.Empty:
+                kind = None
+            
+            if kind == 'event' and index not in finished:
+                yield payload
+            elif kind == 'done' and index not in finished:
+                record(index, **payload)
+            
+            now = time.monotonic()
+            for index in list(started):
+                if index not in finished and now - started[index] >= timeout:
+                    record(index, error=f"timed out after {timeout:.0f}s")
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    if results is not None:
+        results[:] = [finished[index] for index in range(len(scrapers))]
+
+
+def store_stream(db: Database, events: Iterable[Dict[str, Any]], batch_size: int = STREAM_BATCH_SIZE,
+                 flush_seconds: float = STREAM_FLUSH_SECONDS, mode: str = 'upsert',
+                 skip_known: bool = True) -> Dict[str, Any]:
+    """
+    Write a stream of events to the database in batches of batch_size. A partial
+    batch is written once flush_seconds have passed since the last write, by a
+    background flusher, so rows land on time even while the stream is quiet.
+    Returns insert_events counts summed over all batches.
+    
+    With skip_known, each batch is first checked against the fingerprints of
+    earlier runs and events seen before with the same content are counted as
+    'known' and never written.
+    """
+    totals = {'inserted': 0, 'updated': 0, 'ignored': 0, 'failed': 0, 'known': 0, 'by_source': {}}
+    batch = []
+    last_flush = time.monotonic()
+    lock = threading.Lock()
+    done = threading.Event()
+    errors = []
+    
+    def flush():
+        """Write the pending batch; callers hold lock"""
+        nonlocal batch, last_flush
+        pending, batch = batch, []
+        last_flush = time.monotonic()
+        
+        fresh = db.filter_unseen_events(pending) if skip_known else pending
+        totals['known'] += len(pending) - len(fresh)
+        
+        result = db.insert_events(fresh, mode=mode)
+        if skip_known:
+            # Failed rows stay unrecorded so the next run retries them
+            failed = set(result['failed_keys'])
+            db.record_fingerprints([event for event in fresh if event_fingerprint(event) not in failed])
+        
+        for field in ('inserted', 'updated', 'ignored', 'failed'):
+            totals[field] += result[field]
+        for source, counts in result['by_source'].items():
+            source_totals = totals['by_source'].setdefault(
+                source, {'inserted': 0, 'updated': 0, 'ignored': 0, 'failed': 0}
+            )
+            for field, value in counts.items():
+                source_totals[field] += value
+    
+    def flush_when_due():
+        while not done.wait(min(STREAM_POLL_SECONDS, flush_seconds)):
+            with lock:
+                if batch and time.monotonic() - last_flush >= flush_seconds:
+                    try:
+                        flush()
+                    except Exception as e:
+                        errors.append(e)
+                        return
+    
+    flusher = threading.Thread(target=flush_when_due, name='stream-flush', daemon=True)
+    flusher.start()
+    try:
+        for event in events:
+            if errors:
+                break
+            with lock:
+                batch.append(event)
+                if len(batch) >= batch_size:
+                    flush()
+    finally:
+        done.set()
+        flusher.join()
+    
+    if errors:
+        raise errors[0]
+    if batch:
+        flush()
+    
+    return totals
+
+
+def stream_all_scrapers(db: Database, scrapers: Optional[List[Any]] = None,
+                        max_workers: Optional[int] = None, timeout: float = SCRAPER_TIMEOUT_SECONDS,
+                        parse_workers: int = 0, queue_size: int = STREAM_QUEUE_SIZE,
+                        batch_size: int = STREAM_BATCH_SIZE, mode: str = 'upsert',
+                        skip_known: bool = True, incremental: bool = True,
+                        fuzzy: Optional[FuzzyDeduplicator] = None) -> Dict[str, Any]:
+    """
+    Streaming counterpart of run_all_scrapers followed by insert_events: events
+    flow from the scrapers through deduplication into batched database writes
+    without the run ever holding them all. Duplicates across sources keep
+    whichever copy arrived first, and events unchanged since an earlier run
+    are dropped before they reach the database (see store_stream).
+    
+    With incremental, paged sources stop at the first page of listings an
+    earlier run recorded, and sources crawled to the end tombstone the events
+    they no longer list (see pipeline.crawl_state).
+    
+    fuzzy, when given, is a deduplicator shared with other runs, so listings
+    are also merged with their copies from sources scraped in earlier runs.
+    
+    Returns the store_stream totals plus 'removed', and the per-scraper
+    stream_events results under 'results'.
+    """
+    print("Starting streaming scraper pipeline...")
+    print("-" * 50)
+    
+    if scrapers is None:
+        scrapers = default_scrapers()
+    
+    tracker = CrawlTracker(db) if incremental else None
+    if tracker:
+        tracker.prepare(scrapers)
+    
+    results = []
+    shared = fuzzy is not None
+    fuzzy = fuzzy if shared else FuzzyDeduplicator()
+    with parser_pool_for(scrapers, parse_workers):
+        events = stream_events(scrapers, max_workers=max_workers, timeout=timeout,
+                               queue_size=queue_size, results=results)
+        if tracker:
+            events = tracker.observe(events)
+        totals = store_stream(db, deduplicate_stream(events, fuzzy=fuzzy), batch_size=batch_size,
+                              mode=mode, skip_known=skip_known)
+    
+    removed = tracker.finish(scrapers, results) if tracker else {}
+    totals['removed'] = sum(removed.values())
+    totals['results'] = results
+    
+    for result in results:
+        if result['error']:
+            print(f"  Error running {result['source']} scraper: {result['error']}")
+        else:
+            print(f"  Found {result['count']} events from {result['source']} "
+                  f"in {result['elapsed']:.1f}s")
+        if removed.get(result['source']):
+            print(f"  {result['source']} no longer lists {removed[result['source']]} events, tombstoned")
+    
+    print(f"\nTotal events collected: {sum(result['count'] for result in results)}")
+    print(f"Unique events after deduplication: "
+          f"{sum(totals[field] for field in ('inserted', 'updated', 'ignored', 'failed', 'known'))}")
+    if not shared:
+        # A shared deduplicator's merges span runs; they were printed as they were skipped
+        report_merged(fuzzy)
+    
+    return totals
+
+
 def cleanup_old_events(db: Database, days_back: int = 1):
     """
     Remove events older than the specified number of days.
@@ -106,13 +475,17 @@ def main():
     
     print(f"\nCurrent events in database: {db.get_event_count()}")
     
-    events = run_all_scrapers()
+    result = stream_all_scrapers(db, parse_workers=PARSE_WORKERS)
     
     print("\n" + "-" * 50)
-    print("Storing events in database...")
+    print("Stored events in database:")
     
-    inserted_count = db.insert_events(events)
-    print(f"Inserted {inserted_count} new events into database")
+    for source, counts in sorted(result['by_source'].items()):
+        print(f"  {source}: {counts['inserted']} inserted, {counts['updated']} updated, "
+              f"{counts['ignored']} unchanged, {counts['failed']} failed")
+    print(f"Inserted {result['inserted']} new and updated {result['updated']} changed events in database")
+    print(f"Skipped {result['known']} events unchanged since the last run")
+    print(f"Tombstoned {result['removed']} events their sources no longer list")
     
     print("\n" + "-" * 50)
     print("Cleaning up old events...")
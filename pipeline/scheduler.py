@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Long-running scheduler for the scraper pipeline.
+
+Instead of running every source at the cadence of the most volatile one,
+each source runs on its own interval, with jitter so runs don't line up.
+Scraper instances, the HTTP client's connection pools and fetch threads, and
+the parser pool stay warm between runs. One fuzzy deduplicator spans all
+runs, so a listing merges with its copy on a source that ran earlier; it
+forgets listings once their day has passed. A source still running when it
+comes due again is skipped for that slot. Every run, skipped ones included,
+is logged to the scrape_runs table.
+"""
+
+import sys
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pipeline.run_scrape import (
+    PARSE_WORKERS,
+    SCRAPER_TIMEOUT_SECONDS,
+    cleanup_old_events,
+    default_scrapers,
+    stream_all_scrapers,
+)
+from pipeline.dedup import FuzzyDeduplicator
+from scraper.parsing import ParserPool
+from utils.database import Database
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+# Seconds between runs of each source, by source_name
+SOURCE_INTERVALS = {
+    'eventbrite': 30 * MINUTE,
+    'shotgun': 1 * HOUR,
+    'posh': 1 * HOUR,
+    'viewcy': 2 * HOUR,
+    'house_of_yes': 12 * HOUR,
+    'slipper_room': 12 * HOUR,
+    'instagram': 24 * HOUR,
+}
+DEFAULT_INTERVAL = 1 * HOUR
+
+# Each interval is stretched or shrunk by up to this fraction
+JITTER = 0.1
+
+CLEANUP_INTERVAL = 6 * HOUR
+
+# How often the scheduler loop checks for due sources
+TICK_SECONDS = 1.0
+
+
+class Job:
+    """One source's schedule"""
+    
+    def __init__(self, scraper: Any, interval: float, next_run: float):
+        self.scraper = scraper
+        self.interval = interval
+        self.next_run = next_run
+        self.future: Optional[Future] = None
+        # The scraper's own thread, which outlives the run when the scraper times out
+        self.scraper_future: Optional[Future] = None
+    
+    @property
+    def source(self) -> str:
+        return self.scraper.source_name
+    
+    @property
+    def running(self) -> bool:
+        return any(future is not None and not future.done() for future in (self.future, self.scraper_future))
+
+
+class Scheduler:
+    """Runs each scraper on its own interval against one database"""
+    
+    def __init__(self, db: Database, scrapers: Optional[List[Any]] = None,
+                 intervals: Optional[Dict[str, float]] = None, jitter: float = JITTER,
+                 max_workers: Optional[int] = None, parse_workers: int = 0,
+                 timeout: float = SCRAPER_TIMEOUT_SECONDS, cleanup_interval: float = CLEANUP_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic, seed: Optional[int] = None):
+        self.db = db
+        self.jitter = jitter
+        self.timeout = timeout
+        self.cleanup_interval = cleanup_interval
+        self.clock = clock
+        self.random = random.Random(seed)
+        
+        intervals = dict(SOURCE_INTERVALS, **(intervals or {}))
+        now = clock()
+        self.jobs = []
+        for scraper in (scrapers if scrapers is not None else default_scrapers()):
+            interval = intervals.get(scraper.source_name, DEFAULT_INTERVAL)
+            # First runs are spread over the first jitter slice instead of all firing at once
+            self.jobs.append(Job(scraper, interval, now + self.random.uniform(0, jitter * interval)))
+        self.next_cleanup = now + cleanup_interval
+        self.fuzzy = FuzzyDeduplicator()
+        
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or max(1, len(self.jobs)),
+                                           thread_name_prefix='source')
+        self.pool = ParserPool(parse_workers) if parse_workers else None
+        if self.pool:
+            print(f"Started {self.pool.warm()} parser workers")
+            for job in self.jobs:
+                if hasattr(job.scraper, 'parser_pool'):
+                    job.scraper.parser_pool = self.pool
+    
+    def next_delay(self, interval: float) -> float:
+        """Interval until a source's next run, with jitter"""
+        return interval * (1 + self.random.uniform(-self.jitter, self.jitter))
+    
+    def run_pending(self) -> List[str]:
+        """Start every due source that isn't still running; returns the sources started"""
+        now = self.clock()
+        started = []
+        
+        for job in self.jobs:
+            if now < job.next_run:
+                continue
+            job.next_run = now + self.next_delay(job.interval)
+            
+            if job.running:
+                print(f"Skipping {job.source}: previous run still in progress")
+                stamp = datetime.now().isoformat()
+                self.db.record_scrape_run({'source': job.source, 'started_at': stamp,
+                                           'finished_at': stamp, 'status': 'skipped'})
+                continue
+            
+            job.future = self.executor.submit(self.run_job, job)
+            started.append(job.source)
+        
+        if now >= self.next_cleanup:
+            self.next_cleanup = now + self.cleanup_interval
+            cleanup_old_events(self.db, days_back=1)
+            self.fuzzy.prune((datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'))
+        
+        return started
+    
+    def run_job(self, job: Job) -> Dict[str, Any]:
+        """Scrape one source into the database and log the run"""
+        run = {'source': job.source, 'started_at': datetime.now().isoformat()}
+        
+        try:
+            totals = stream_all_scrapers(self.db, [job.scraper], timeout=self.timeout, fuzzy=self.fuzzy)
+            result = totals['results'][0]
+            job.scraper_future = result['future']
+            run.update(
+                status='error' if result['error'] else 'ok',
+                error=result['error'],
+                events_seen=result['count'],
+                inserted=totals['inserted'],
+                updated=totals['updated'],
+                known=totals['known'],
+                removed=totals['removed'],
+            )
+        except Exception as e:
+            print(f"Error running {job.source}: {e}")
+            run.update(status='error', error=str(e))
+        
+        run['finished_at'] = datetime.now().isoformat()
+        self.db.record_scrape_run(run)
+        return run
+    
+    def history(self, source: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent runs first, optionally for one source"""
+        return self.db.get_scrape_runs(source, limit)
+    
+    def run_forever(self, stop: Optional[threading.Event] = None):
+        """Run due sources until stop is set or the process is interrupted"""
+        stop = stop or threading.Event()
+        for job in self.jobs:
+            print(f"  {job.source}: every {job.interval / MINUTE:.0f} min")
+        
+        try:
+            while not stop.is_set():
+                self.run_pending()
+                stop.wait(TICK_SECONDS)
+        except KeyboardInterrupt:
+            print("Stopping scheduler...")
+        finally:
+            self.close()
+    
+    def close(self):
+        """Wait for running sources and release the HTTP clients and parser pool"""
+        self.executor.shutdown(wait=True)
+        # Scrapers mostly share one client; close each once
+        clients = {id(client): client for client in (getattr(job.scraper, 'http', None) for job in self.jobs)
+                   if client is not None}
+        for client in clients.values():
+            client.close()
+        if self.pool:
+            for job in self.jobs:
+                if hasattr(job.scraper, 'parser_pool'):
+                    job.scraper.parser_pool = None
+            self.pool.close()
+
+
+def main():
+    """Run the pipeline as a daemon"""
+    print("=" * 50)
+    print("MOR Night Planner - Scraper Scheduler")
+    print("=" * 50)
+    
+    Scheduler(Database(), parse_workers=PARSE_WORKERS).run_forever()
+
+
+if __name__ == '__main__':
+    main()
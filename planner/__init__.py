@@ -0,0 +1,26 @@
+from .features import EventFeatures, extract_features, parse_minute_of_day, timestamp_minutes
+from .itinerary import Itinerary, ItineraryPlanner
+from .scoring import CandidateTable, NightScorer, TRAVEL_SLACK_MINUTES
+from .selection import top_k, top_k_indices
+from .travel import TravelTimeMatrix, TRAVEL_TIMES
+from .venues import VenueRegistry, TravelEstimator, VENUES, TRAVEL_ESTIMATOR
+
+__all__ = [
+    'EventFeatures',
+    'extract_features',
+    'parse_minute_of_day',
+    'timestamp_minutes',
+    'Itinerary',
+    'ItineraryPlanner',
+    'CandidateTable',
+    'NightScorer',
+    'TRAVEL_SLACK_MINUTES',
+    'top_k',
+    'top_k_indices',
+    'TravelTimeMatrix',
+    'TRAVEL_TIMES',
+    'VenueRegistry',
+    'TravelEstimator',
+    'VENUES',
+    'TRAVEL_ESTIMATOR',
+]
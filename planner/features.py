@@ -0,0 +1,79 @@
+from typing import Any, Dict, NamedTuple, Optional
+from datetime import datetime
+
+
+VENUES_30_PLUS = ['house of yes', 'slipper room', 'jazz standard', 'blue note', 'village vanguard']
+
+INTENSE_KEYWORDS = ['edm', 'rave', 'techno', 'bass', 'warehouse', 'club', 'dj']
+SEATED_KEYWORDS = ['dinner', 'show', 'theater', 'burlesque', 'comedy', 'jazz', 'seated']
+
+YOUNGER_CROWD_KEYWORDS = ['college', 'student']
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class EventFeatures(NamedTuple):
+    """Per-event planner inputs, computed once when an event is loaded"""
+    neighborhood: str
+    venue: str
+    is_intense: bool
+    is_seated: bool
+    is_30_plus_venue: bool
+    is_younger_crowd: bool
+    start_minute: Optional[int]
+    price_min: Optional[float]
+    start_at: Optional[float]
+    end_at: Optional[float]
+
+
+def parse_minute_of_day(value: str) -> Optional[int]:
+    """Parse an 'HH:MM' string into minutes after midnight"""
+    try:
+        hours, minutes = value.strip().split(':')[:2]
+        return int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+
+
+def timestamp_minutes(value: datetime) -> float:
+    """Minutes since the epoch on the datetime's own wall clock (any offset is dropped)"""
+    return (value.replace(tzinfo=None) - EPOCH).total_seconds() / 60
+
+
+def parse_timestamp_minutes(value: Optional[str]) -> Optional[float]:
+    """Parse an ISO datetime string into timestamp_minutes, as start_minute reads it"""
+    try:
+        return timestamp_minutes(datetime.fromisoformat((value or '').replace('Z', '+00:00')))
+    except ValueError:
+        return None
+
+
+def extract_features(event: Dict[str, Any]) -> EventFeatures:
+    """Compute the planner features for one event"""
+    title_lower = (event.get('title') or '').lower()
+    desc_lower = (event.get('description') or '').lower()
+    tags_lower = {t.lower() for t in event.get('raw_tags') or []}
+    venue_lower = (event.get('venue_name') or '').lower()
+    
+    def mentions(keywords):
+        return any(kw in title_lower or kw in desc_lower or kw in tags_lower for kw in keywords)
+    
+    start_minute = None
+    try:
+        event_dt = datetime.fromisoformat((event.get('start_datetime') or '').replace('Z', '+00:00'))
+        start_minute = event_dt.hour * 60 + event_dt.minute
+    except ValueError:
+        pass
+    
+    return EventFeatures(
+        neighborhood=(event.get('neighborhood') or '').lower(),
+        venue=venue_lower,
+        is_intense=mentions(INTENSE_KEYWORDS),
+        is_seated=mentions(SEATED_KEYWORDS),
+        is_30_plus_venue=any(v in venue_lower for v in VENUES_30_PLUS),
+        is_younger_crowd=any(kw in title_lower for kw in YOUNGER_CROWD_KEYWORDS),
+        start_minute=start_minute,
+        price_min=event.get('price_min'),
+        start_at=parse_timestamp_minutes(event.get('start_datetime')),
+        end_at=parse_timestamp_minutes(event.get('end_datetime')),
+    )
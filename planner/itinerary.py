@@ -0,0 +1,126 @@
+import heapq
+import time
+from typing import Callable, List, NamedTuple, Optional
+import numpy as np
+
+from .scoring import CandidateTable
+from .selection import top_k_indices
+
+
+# Planned stay when an event has no end time, and the longest stay planned at one
+# stop, so an all-night party doesn't swallow the rest of the itinerary
+DEFAULT_STAY_MINUTES = 120
+MAX_STAY_MINUTES = 180
+
+
+class Itinerary(NamedTuple):
+    """An ordered plan: table rows, minutes travelled into each stop, and the summed score"""
+    stops: List[int]
+    legs: List[int]
+    score: float
+    complete: bool
+
+
+class ItineraryPlanner:
+    """
+    Chooses an ordered sequence of stops with the highest total score.
+    Candidates are visited in start order and each keeps its few best partial
+    itineraries ending there, built only from the best reachable predecessors,
+    so the work per candidate is bounded. Once time_budget_ms runs out the best
+    itinerary found so far is returned with complete=False.
+    """
+    
+    def __init__(self, travel_between: Callable[[CandidateTable, np.ndarray], np.ndarray],
+                 max_stops: int = 3, max_leg_minutes: Optional[int] = None, budget: Optional[float] = None,
+                 time_budget_ms: float = 50.0, max_candidates: int = 300, max_predecessors: int = 16,
+                 labels_per_stop: int = 4):
+        self.travel_between = travel_between
+        self.max_stops = max_stops
+        self.max_leg_minutes = max_leg_minutes
+        self.budget = budget
+        self.time_budget_ms = time_budget_ms
+        self.max_candidates = max_candidates
+        self.max_predecessors = max_predecessors
+        self.labels_per_stop = labels_per_stop
+    
+    def eligible(self, table: CandidateTable, scores: np.ndarray, travel_from_home: np.ndarray,
+                 window_start: Optional[float], window_end: Optional[float]) -> np.ndarray:
+        """Rows that can appear in an itinerary at all, best max_candidates by score, in start order"""
+        with np.errstate(invalid='ignore'):
+            mask = (scores > 0) & ~np.isnan(table.start_at)
+            if window_start is not None:
+                mask &= table.start_at >= window_start
+            if window_end is not None:
+                mask &= table.start_at <= window_end
+            if self.max_leg_minutes is not None:
+                mask &= travel_from_home <= self.max_leg_minutes
+            if self.budget is not None:
+                mask &= np.nan_to_num(table.price_min) <= self.budget
+        
+        rows = np.flatnonzero(mask)
+        if len(rows) > self.max_candidates:
+            rows = rows[top_k_indices(scores[rows], self.max_candidates)]
+        return rows[np.argsort(table.start_at[rows], kind='stable')]
+    
+    def plan(self, table: CandidateTable, scores: np.ndarray, travel_from_home: np.ndarray,
+             window_start: Optional[float] = None, window_end: Optional[float] = None) -> Itinerary:
+        """Search for the best itinerary; window bounds are timestamp minutes for stop start times"""
+        deadline = time.perf_counter() + self.time_budget_ms / 1000
+        
+        rows = self.eligible(table, scores, travel_from_home, window_start, window_end)
+        start = table.start_at[rows]
+        end = table.end_at[rows]
+        leave = np.where(np.isnan(end), start + DEFAULT_STAY_MINUTES,
+                         np.clip(end, start, start + MAX_STAY_MINUTES))
+        value = scores[rows]
+        cost = np.nan_to_num(table.price_min[rows])
+        home = travel_from_home[rows]
+        legs = self.travel_between(table, rows) if len(rows) else np.zeros((0, 0), dtype=np.int32)
+        
+        # labels[j]: best partial itineraries ending at position j, as
+        # (score, -travel, -spent, positions, legs)
+        labels = []
+        best_at = np.full(len(rows), -np.inf)
+        # The best single stop, so a deadline hit before any label is built still returns a plan
+        best = max(((float(value[j]), -int(home[j]), -float(cost[j]), (j,), (int(home[j]),))
+                    for j in range(len(rows))), key=lambda label: label[:3], default=None)
+        complete = True
+        
+        for j in range(len(rows)):
+            if time.perf_counter() > deadline:
+                complete = False
+                break
+            
+            options = [(float(value[j]), -int(home[j]), -float(cost[j]), (j,), (int(home[j]),))]
+            if self.max_stops > 1 and j:
+                reachable = leave[:j] + legs[:j, j] <= start[j]
+                if self.max_leg_minutes is not None:
+                    reachable &= legs[:j, j] <= self.max_leg_minutes
+                predecessors = np.flatnonzero(reachable)
+                if len(predecessors) > self.max_predecessors:
+                    predecessors = predecessors[top_k_indices(best_at[predecessors], self.max_predecessors)]
+                
+                for i in predecessors:
+                    leg = int(legs[i, j])
+                    for score, travel, spent, positions, path_legs in labels[i]:
+                        if len(positions) >= self.max_stops:
+                            continue
+                        if self.budget is not None and cost[j] - spent > self.budget:
+                            continue
+                        options.append((score + float(value[j]), travel - leg, spent - float(cost[j]),
+                                        positions + (j,), path_legs + (leg,)))
+            
+            kept = heapq.nlargest(self.labels_per_stop, options, key=lambda label: label[:3])
+            labels.append(kept)
+            best_at[j] = kept[0][0]
+            if best is None or kept[0][:3] > best[:3]:
+                best = kept[0]
+        
+        if best is None:
+            return Itinerary(stops=[], legs=[], score=0.0, complete=complete)
+        return Itinerary(
+            stops=[int(rows[p]) for p in best[3]],
+            legs=list(best[4]),
+            score=best[0],
+            complete=complete,
+        )
@@ -0,0 +1,169 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+from .features import extract_features, parse_minute_of_day
+
+
+# Events up to this many minutes beyond max_travel_minutes still score positively
+TRAVEL_SLACK_MINUTES = 15
+
+
+class CandidateTable:
+    """
+    A day's candidate events stored as columnar arrays for batch scoring.
+    Built once per cached query; row i of every column describes events[i].
+    """
+    
+    def __init__(self, events: List[Dict[str, Any]],
+                 locate: Optional[Callable[[Optional[str], Optional[str]], Optional[Tuple[float, float, bool]]]] = None):
+        self.events = events
+        features = [extract_features(event) for event in events]
+        
+        self.neighborhoods = sorted({f.neighborhood for f in features})
+        neighborhood_ids = {name: i for i, name in enumerate(self.neighborhoods)}
+        
+        self.neighborhood_idx = np.array([neighborhood_ids[f.neighborhood] for f in features], dtype=np.intp)
+        self.is_intense = np.array([f.is_intense for f in features], dtype=bool)
+        self.is_seated = np.array([f.is_seated for f in features], dtype=bool)
+        self.is_30_plus_venue = np.array([f.is_30_plus_venue for f in features], dtype=bool)
+        self.is_younger_crowd = np.array([f.is_younger_crowd for f in features], dtype=bool)
+        self.has_start = np.array([f.start_minute is not None for f in features], dtype=bool)
+        self.start_minute = np.array([f.start_minute or 0 for f in features], dtype=np.int32)
+        self.price_min = np.array(
+            [np.nan if f.price_min is None else f.price_min for f in features], dtype=np.float64
+        )
+        self.start_at = np.array([np.nan if f.start_at is None else f.start_at for f in features], dtype=np.float64)
+        self.end_at = np.array([np.nan if f.end_at is None else f.end_at for f in features], dtype=np.float64)
+        
+        # Coordinates from locate(venue_name, neighborhood); NaN where unknown
+        located = [locate(event.get('venue_name'), event.get('neighborhood')) if locate else None for event in events]
+        self.lat = np.array([np.nan if loc is None else loc[0] for loc in located], dtype=np.float64)
+        self.lon = np.array([np.nan if loc is None else loc[1] for loc in located], dtype=np.float64)
+        self.has_coordinates = ~np.isnan(self.lat)
+        self.is_venue_level = np.array([bool(loc and loc[2]) for loc in located], dtype=bool)
+    
+    def __len__(self) -> int:
+        return len(self.events)
+    
+    def map_neighborhoods(self, fn: Callable[[str], Any]) -> np.ndarray:
+        """Evaluate fn once per distinct neighborhood and spread the result over the rows"""
+        per_neighborhood = np.array([fn(n) for n in self.neighborhoods])
+        if not len(self):
+            return per_neighborhood[:0]
+        return per_neighborhood[self.neighborhood_idx]
+
+
+class NightScorer:
+    """
+    The plan-night-v2 heuristic over a CandidateTable.
+    score() computes every score with array operations; reasons() builds the
+    human-readable explanation for a single row, so only winners pay for it.
+    """
+    
+    def __init__(self, estimate_travel: Callable[[CandidateTable], np.ndarray], max_travel_minutes: int,
+                 energy_level: str, wants_dinner: bool = False, crowd_preference: str = 'no_preference',
+                 start_time: Optional[str] = None, end_time: Optional[str] = None):
+        self.estimate_travel = estimate_travel
+        self.max_travel_minutes = max_travel_minutes
+        self.energy_level = energy_level
+        self.wants_dinner = wants_dinner
+        self.crowd_preference = crowd_preference
+        self.window_start = parse_minute_of_day(start_time) if start_time else None
+        self.window_end = parse_minute_of_day(end_time) if end_time else None
+        self._travel = (None, None)
+    
+    def travel_minutes(self, table: CandidateTable) -> np.ndarray:
+        """Travel time from home base for every row, estimated once per table"""
+        cached_table, travel = self._travel
+        if cached_table is not table:
+            travel = np.asarray(self.estimate_travel(table), dtype=np.int32)
+            self._travel = (table, travel)
+        return travel
+    
+    def has_window(self) -> bool:
+        """Whether the request carried a parseable time window"""
+        return self.window_start is not None and self.window_end is not None
+    
+    def in_time_window(self, minutes):
+        """Whether start minutes (an int or an array) fall inside the window, which may wrap past midnight"""
+        if self.window_start <= self.window_end:
+            return (minutes >= self.window_start) & (minutes <= self.window_end)
+        return (minutes >= self.window_start) | (minutes <= self.window_end)
+    
+    def score(self, table: CandidateTable) -> np.ndarray:
+        """Score every row of the table"""
+        scores = np.full(len(table), 50.0)
+        
+        travel = self.travel_minutes(table)
+        scores += np.where(
+            travel <= self.max_travel_minutes, 20,
+            np.where(travel <= self.max_travel_minutes + TRAVEL_SLACK_MINUTES, 10, -20)
+        )
+        
+        seated = table.is_seated
+        intense = table.is_intense
+        if self.energy_level == 'low':
+            scores += 25 * seated - 30 * intense
+            if self.wants_dinner:
+                scores += 15 * seated
+        elif self.energy_level == 'medium':
+            scores += 10 * seated - 10 * intense
+        elif self.energy_level == 'high':
+            scores += 25 * intense - 15 * seated
+        
+        if self.crowd_preference == '30_plus_preferred':
+            scores += 20 * table.is_30_plus_venue
+            scores -= 20 * (~table.is_30_plus_venue & table.is_younger_crowd)
+        
+        if self.has_window():
+            scores += table.has_start * np.where(self.in_time_window(table.start_minute), 15, -10)
+        
+        price = table.price_min
+        with np.errstate(invalid='ignore'):
+            scores += np.where(price == 0, 5, np.where(price < 20, 3, 0))
+        
+        return scores
+    
+    def reasons(self, table: CandidateTable, index: int) -> List[str]:
+        """Explain the score of one row, in the order the scoring rules apply"""
+        reasons = []
+        
+        travel = int(self.travel_minutes(table)[index])
+        if travel <= self.max_travel_minutes:
+            reasons.append(f"within {self.max_travel_minutes} min travel")
+        elif travel <= self.max_travel_minutes + TRAVEL_SLACK_MINUTES:
+            reasons.append(f"slightly outside travel range ({travel} min)")
+        else:
+            reasons.append(f"far from home base ({travel} min)")
+        
+        seated = table.is_seated[index]
+        intense = table.is_intense[index]
+        if self.energy_level == 'low':
+            if seated:
+                reasons.append("seated/show style (good for low energy)")
+            if intense:
+                reasons.append("too intense for low energy")
+            if self.wants_dinner and seated:
+                reasons.append("dinner-friendly")
+        elif self.energy_level == 'medium':
+            if seated:
+                reasons.append("good mix of seated and standing")
+        elif self.energy_level == 'high':
+            if intense:
+                reasons.append("high energy event")
+            if seated:
+                reasons.append("too seated for high energy")
+        
+        if self.crowd_preference == '30_plus_preferred':
+            if table.is_30_plus_venue[index]:
+                reasons.append("known for 30+ crowd")
+            elif table.is_younger_crowd[index]:
+                reasons.append("younger crowd")
+        
+        if self.has_window() and table.has_start[index] and self.in_time_window(int(table.start_minute[index])):
+            reasons.append("within your time window")
+        
+        if table.price_min[index] == 0:
+            reasons.append("free event")
+        
+        return reasons
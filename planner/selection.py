@@ -0,0 +1,36 @@
+import heapq
+from typing import Any, Callable, Iterable, List
+import numpy as np
+
+
+def top_k(items: Iterable[Any], k: int, key: Callable[[Any], Any], largest: bool = True) -> List[Any]:
+    """
+    Select the k best items in O(n log k).
+    Same result as sorted(items, key=key, reverse=largest)[:k]: ties keep input order.
+    """
+    if largest:
+        return heapq.nlargest(k, items, key=key)
+    return heapq.nsmallest(k, items, key=key)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first, in O(n + k log k).
+    Ties are broken by lower index, so results are deterministic.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.intp)
+    
+    if k < n:
+        # Everything scoring above the k-th best value is in; fill the rest with the
+        # lowest-index rows that tie with it, the same rows a stable sort would keep
+        threshold = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > threshold)
+        tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(n)
+    
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
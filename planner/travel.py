@@ -0,0 +1,94 @@
+from typing import Dict, List, Optional
+import numpy as np
+
+
+# Measured door-to-door minutes between neighborhoods. Pairs that are missing
+# here are filled in with shortest paths through the listed ones.
+NEIGHBORHOOD_TRAVEL_MINUTES = {
+    'harlem': {'harlem': 0, 'upper west side': 15, 'upper east side': 20, 'midtown': 25,
+              'chelsea': 35, 'east village': 40, 'lower east side': 45, 'brooklyn': 50, 'bushwick': 60},
+    'upper west side': {'upper west side': 0, 'harlem': 15, 'midtown': 15, 'upper east side': 20,
+                       'chelsea': 25, 'east village': 35, 'lower east side': 40, 'brooklyn': 45, 'bushwick': 55},
+    'upper east side': {'upper east side': 0, 'harlem': 20, 'midtown': 15, 'upper west side': 20,
+                       'chelsea': 30, 'east village': 25, 'lower east side': 30, 'brooklyn': 40, 'bushwick': 50},
+    'midtown': {'midtown': 0, 'upper west side': 15, 'upper east side': 15, 'chelsea': 10,
+               'east village': 20, 'lower east side': 25, 'brooklyn': 35, 'bushwick': 45, 'harlem': 25},
+    'chelsea': {'chelsea': 0, 'midtown': 10, 'east village': 15, 'west village': 10, 'soho': 15,
+               'lower east side': 20, 'brooklyn': 30, 'bushwick': 40, 'harlem': 35},
+    'east village': {'east village': 0, 'lower east side': 10, 'chelsea': 15, 'midtown': 20,
+                    'brooklyn': 25, 'bushwick': 35, 'williamsburg': 20, 'harlem': 40},
+    'lower east side': {'lower east side': 0, 'east village': 10, 'soho': 15, 'brooklyn': 20,
+                       'williamsburg': 15, 'bushwick': 30, 'chelsea': 20, 'harlem': 45},
+    'brooklyn': {'brooklyn': 0, 'bushwick': 15, 'williamsburg': 10, 'lower east side': 20,
+                'east village': 25, 'chelsea': 30, 'midtown': 35, 'harlem': 50},
+    'bushwick': {'bushwick': 0, 'williamsburg': 10, 'brooklyn': 15, 'lower east side': 30,
+                'east village': 35, 'chelsea': 40, 'midtown': 45, 'harlem': 60},
+    'williamsburg': {'williamsburg': 0, 'bushwick': 10, 'brooklyn': 10, 'lower east side': 15,
+                    'east village': 20, 'chelsea': 30, 'midtown': 35, 'harlem': 50},
+}
+
+# Travel time to a neighborhood that isn't in the graph
+DEFAULT_TRAVEL_MINUTES = 35
+
+# Travel time to an event whose neighborhood is unknown or TBD
+UNKNOWN_LOCATION_MINUTES = 30
+
+
+class TravelTimeMatrix:
+    """
+    Dense all-pairs travel times between neighborhoods.
+    The edge table is made symmetric and completed with Floyd-Warshall once,
+    so every lookup afterwards is a dict hit plus array indexing.
+    """
+    
+    def __init__(self, edges: Dict[str, Dict[str, int]]):
+        self.names = sorted(set(edges) | {name for row in edges.values() for name in row})
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        
+        n = len(self.names)
+        dist = np.full((n, n), np.inf)
+        np.fill_diagonal(dist, 0)
+        for origin, row in edges.items():
+            for destination, minutes in row.items():
+                i, j = self.ids[origin], self.ids[destination]
+                dist[i, j] = dist[j, i] = min(dist[i, j], dist[j, i], minutes)
+        
+        for k in range(n):
+            dist = np.minimum(dist, dist[:, k:k + 1] + dist[k:k + 1, :])
+        
+        dist[np.isinf(dist)] = DEFAULT_TRAVEL_MINUTES
+        self.matrix = dist.astype(np.int32)
+    
+    def neighborhood_id(self, name: Optional[str]) -> Optional[int]:
+        """Matrix index of a neighborhood, or None if it isn't in the graph"""
+        return self.ids.get((name or '').strip().lower())
+    
+    def travel_time(self, origin: Optional[str], destination: Optional[str]) -> int:
+        """Minutes from origin to destination neighborhood (case-insensitive)"""
+        destination = (destination or '').strip().lower()
+        if not destination or destination == 'tbd':
+            return UNKNOWN_LOCATION_MINUTES
+        
+        i = self.neighborhood_id(origin)
+        j = self.ids.get(destination)
+        if i is None or j is None:
+            return DEFAULT_TRAVEL_MINUTES
+        return int(self.matrix[i, j])
+    
+    def neighborhood_filter(self, origin: Optional[str], limit: int) -> Dict[str, List[str]]:
+        """
+        Neighborhood constraint for Database.get_candidate_events that keeps every
+        destination reachable from origin within limit minutes.
+        """
+        times = {name: self.travel_time(origin, name) for name in self.names}
+        
+        if DEFAULT_TRAVEL_MINUTES <= limit:
+            return {'exclude_neighborhoods': [name for name, minutes in times.items() if minutes > limit]}
+        
+        allowed = [name for name, minutes in times.items() if minutes <= limit]
+        if UNKNOWN_LOCATION_MINUTES <= limit:
+            allowed += ['', 'tbd']
+        return {'neighborhoods': allowed}
+
+
+TRAVEL_TIMES = TravelTimeMatrix(NEIGHBORHOOD_TRAVEL_MINUTES)
@@ -0,0 +1,226 @@
+import json
+import math
+import os
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+
+from .travel import TRAVEL_TIMES, TravelTimeMatrix, DEFAULT_TRAVEL_MINUTES, UNKNOWN_LOCATION_MINUTES
+
+
+VENUES_PATH = os.path.join(os.path.dirname(__file__), 'data', 'venues.json')
+
+EARTH_RADIUS_KM = 6371.0
+
+# Street routes are longer than the straight line; about 1.3x on the Manhattan grid
+CIRCUITY_FACTOR = 1.3
+
+# Door-to-door speed and fixed overhead (waiting, walking to the station) per mode
+TRAVEL_MODES = {
+    'walk': {'speed_kmh': 4.8, 'overhead_minutes': 0},
+    'transit': {'speed_kmh': 20.0, 'overhead_minutes': 6},
+    'taxi': {'speed_kmh': 22.0, 'overhead_minutes': 4},
+}
+
+KM_PER_MILE = 1.609344
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; works on floats and NumPy arrays"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def travel_minutes(distance_km, mode: str = 'transit'):
+    """Estimated door-to-door minutes for a straight-line distance"""
+    model = TRAVEL_MODES[mode]
+    return np.rint(model['overhead_minutes'] + distance_km * CIRCUITY_FACTOR / model['speed_kmh'] * 60)
+
+
+def reach_km(minutes: float, mode: str = 'transit') -> float:
+    """Straight-line distance coverable in the given minutes (inverse of travel_minutes)"""
+    model = TRAVEL_MODES[mode]
+    return max(0.0, minutes - model['overhead_minutes']) * model['speed_kmh'] / 60 / CIRCUITY_FACTOR
+
+
+class VenueRegistry:
+    """
+    Venue and neighborhood coordinates, seeded from a local JSON file.
+    Venues are bucketed in a uniform lat/lon grid so radius queries only
+    look at the handful of cells around the origin.
+    """
+    
+    def __init__(self, venues: Dict[str, Dict[str, Any]], neighborhoods: Dict[str, List[float]],
+                 cell_km: float = 0.5):
+        self.venues = {name.lower(): (float(v['lat']), float(v['lon'])) for name, v in venues.items()}
+        self.venue_neighborhoods = {name.lower(): (v.get('neighborhood') or '').lower() for name, v in venues.items()}
+        self.neighborhoods = {name.lower(): (float(lat), float(lon)) for name, (lat, lon) in neighborhoods.items()}
+        
+        points = list(self.venues.values()) or [(40.73, -73.99)]
+        reference_lat = sum(lat for lat, _ in points) / len(points)
+        self.cell_lat = cell_km / 111.32
+        self.cell_lon = cell_km / (111.32 * math.cos(math.radians(reference_lat)))
+        
+        self._grid = {}
+        for name, (lat, lon) in self.venues.items():
+            self._grid.setdefault(self._cell(lat, lon), []).append(name)
+    
+    @classmethod
+    def load(cls, path: str = VENUES_PATH) -> 'VenueRegistry':
+        """Build the registry from a seed file"""
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data.get('venues', {}), data.get('neighborhoods', {}))
+    
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_lat)), int(math.floor(lon / self.cell_lon))
+    
+    def locate(self, name: Optional[str]) -> Optional[Tuple[float, float]]:
+        """Coordinates of a venue or neighborhood name (case-insensitive)"""
+        key = (name or '').strip().lower()
+        return self.venues.get(key) or self.neighborhoods.get(key)
+    
+    def coordinates(self, venue_name: Optional[str], neighborhood: Optional[str]) -> Optional[Tuple[float, float, bool]]:
+        """Best known (lat, lon, is_venue_level) for an event location"""
+        venue = self.venues.get((venue_name or '').strip().lower())
+        if venue:
+            return venue[0], venue[1], True
+        centroid = self.neighborhoods.get((neighborhood or '').strip().lower())
+        if centroid:
+            return centroid[0], centroid[1], False
+        return None
+    
+    def venues_within_km(self, origin: Optional[str], km: float) -> List[str]:
+        """Venue names within km of origin, nearest first. Empty if origin is unknown."""
+        home = self.locate(origin)
+        if home is None:
+            return []
+        
+        row, col = self._cell(*home)
+        row_span = int(math.ceil(km / 111.32 / self.cell_lat))
+        col_span = int(math.ceil(km / 111.32 / math.cos(math.radians(home[0])) / self.cell_lon))
+        
+        found = []
+        for i in range(row - row_span, row + row_span + 1):
+            for j in range(col - col_span, col + col_span + 1):
+                for name in self._grid.get((i, j), ()):
+                    distance = float(haversine_km(home[0], home[1], *self.venues[name]))
+                    if distance <= km:
+                        found.append((distance, name))
+        
+        return [name for _, name in sorted(found)]
+    
+    def venues_within(self, origin: Optional[str], minutes: float, mode: str = 'transit') -> List[str]:
+        """Venue names reachable from origin within the given minutes"""
+        return self.venues_within_km(origin, reach_km(minutes, mode))
+    
+    def neighborhoods_within_km(self, origin: Optional[str], km: float) -> Set[str]:
+        """
+        Lowercase neighborhoods with a centroid or a registered venue within km of
+        origin. Empty if origin is unknown.
+        """
+        home = self.locate(origin)
+        if home is None:
+            return set()
+        
+        found = {self.venue_neighborhoods[name] for name in self.venues_within_km(origin, km)}
+        found.update(name for name, centroid in self.neighborhoods.items()
+                     if float(haversine_km(home[0], home[1], *centroid)) <= km)
+        found.discard('')
+        return found
+    
+    def radius_filter(self, origin: Optional[str], km: float) -> Optional[Callable[[Dict[str, Any]], bool]]:
+        """
+        Predicate keeping events within km of origin, or None if origin can't be located.
+        Events at unregistered venues fall back to their neighborhood centroid, and are
+        kept when neither is known.
+        """
+        home = self.locate(origin)
+        if home is None:
+            return None
+        nearby = set(self.venues_within_km(origin, km))
+        
+        def within(event: Dict[str, Any]) -> bool:
+            venue = (event.get('venue_name') or '').strip().lower()
+            if venue in self.venues:
+                return venue in nearby
+            centroid = self.neighborhoods.get((event.get('neighborhood') or '').strip().lower())
+            return centroid is None or float(haversine_km(home[0], home[1], *centroid)) <= km
+        
+        return within
+
+
+class TravelEstimator:
+    """
+    Travel times from a home base to candidate events. Venue-level coordinates win;
+    otherwise the measured neighborhood matrix is used, then neighborhood centroids,
+    then the matrix default.
+    """
+    
+    def __init__(self, registry: VenueRegistry, matrix: TravelTimeMatrix = TRAVEL_TIMES, mode: str = 'transit'):
+        self.registry = registry
+        self.matrix = matrix
+        self.mode = mode
+    
+    def from_origin(self, origin: Optional[str], table) -> np.ndarray:
+        """Minutes from origin to every row of a CandidateTable"""
+        minutes = table.map_neighborhoods(lambda n: self.matrix.travel_time(origin, n)).astype(np.float64)
+        home = self.registry.locate(origin)
+        if home is None or not len(table):
+            return minutes.astype(np.int32)
+        
+        in_matrix = table.map_neighborhoods(lambda n: self.matrix.neighborhood_id(n) is not None)
+        use_coordinates = table.is_venue_level | (table.has_coordinates & ~in_matrix)
+        if self.matrix.neighborhood_id(origin) is None:
+            use_coordinates |= table.has_coordinates
+        
+        with np.errstate(invalid='ignore'):
+            estimated = travel_minutes(haversine_km(home[0], home[1], table.lat, table.lon), self.mode)
+        return np.where(use_coordinates, estimated, minutes).astype(np.int32)
+    
+    def neighborhood_filter(self, origin: Optional[str], limit: float) -> Dict[str, List[str]]:
+        """
+        Neighborhood constraint for Database.get_candidate_events. The matrix filter
+        is widened by every neighborhood the registry puts within limit minutes, so
+        events that from_origin would score as reachable are not dropped up front.
+        Registered venues within reach are let through whatever neighborhood their
+        events carry, since from_origin scores those by the venue's coordinates.
+        """
+        filters = self.matrix.neighborhood_filter(origin, limit)
+        km = reach_km(limit, self.mode)
+        reachable = self.registry.neighborhoods_within_km(origin, km)
+        
+        if 'neighborhoods' in filters:
+            filters['neighborhoods'] = sorted({name.lower() for name in filters['neighborhoods']} | reachable)
+        else:
+            filters['exclude_neighborhoods'] = [name for name in filters['exclude_neighborhoods']
+                                                if name.lower() not in reachable]
+        venues = self.registry.venues_within_km(origin, km)
+        if venues:
+            filters['venues'] = sorted(venues)
+        return filters
+    
+    def between(self, table, rows: np.ndarray) -> np.ndarray:
+        """Minutes between every pair of the given CandidateTable rows, as a square matrix"""
+        ids = table.map_neighborhoods(lambda n: -1 if self.matrix.neighborhood_id(n) is None
+                                      else self.matrix.neighborhood_id(n))[rows]
+        unknown = table.map_neighborhoods(lambda n: n in ('', 'tbd'))[rows]
+        known = ids >= 0
+        
+        minutes = np.where(known[:, None] & known[None, :], self.matrix.matrix[ids][:, ids], DEFAULT_TRAVEL_MINUTES)
+        minutes = np.where(unknown[:, None] | unknown[None, :], UNKNOWN_LOCATION_MINUTES, minutes)
+        
+        lat, lon = table.lat[rows], table.lon[rows]
+        located = table.has_coordinates[rows]
+        precise = table.is_venue_level[rows] | (located & ~known)
+        use_coordinates = located[:, None] & located[None, :] & (precise[:, None] | precise[None, :])
+        with np.errstate(invalid='ignore'):
+            estimated = travel_minutes(haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :]), self.mode)
+        
+        minutes = np.where(use_coordinates, estimated, minutes).astype(np.int32)
+        np.fill_diagonal(minutes, 0)
+        return minutes
+
+
+VENUES = VenueRegistry.load()
+TRAVEL_ESTIMATOR = TravelEstimator(VENUES)
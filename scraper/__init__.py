@@ -1,4 +1,6 @@
 from .base_scraper import BaseScraper
+from .engine import SourceSpec, SpecScraper
+from .sources import SOURCES
 from .eventbrite_scraper import EventbriteScraper
 from .posh_scraper import PoshScraper
 from .house_of_yes_scraper import HouseOfYesScraper
@@ -9,6 +11,9 @@ from .viewcy_scraper import ViewcyScraper
 
 __all__ = [
     'BaseScraper',
+    'SourceSpec',
+    'SpecScraper',
+    'SOURCES',
     'EventbriteScraper',
     'PoshScraper',
     'HouseOfYesScraper',
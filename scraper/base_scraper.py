@@ -1,15 +1,46 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Callable, Iterator, NamedTuple, Optional
 from datetime import datetime
 import json
+import requests
+
+from .http import HttpClient, DEFAULT_CLIENT
+from .response_cache import CachedResponse, ResponseCache, DEFAULT_CACHE, content_hash
+
+
+class PageResult(NamedTuple):
+    """Outcome of fetching one listing page"""
+    status_code: int
+    events: List[Dict[str, Any]]
+    from_cache: bool
 
 
 class BaseScraper(ABC):
     """Base class for all event scrapers"""
     
-    def __init__(self, source_name: str):
+    # Bump when a scraper's page parsing changes, so cached extractions are redone
+    PARSER_VERSION = 1
+    
+    # Paging for scrape_async: pages are fetched PAGE_WINDOW at a time until one
+    # comes back empty or MAX_PAGES is reached
+    MAX_PAGES = 1
+    PAGE_WINDOW = 3
+    PAGE_TIMEOUT = 15
+    
+    def __init__(self, source_name: str, http: Optional[HttpClient] = None,
+                 cache: Optional[ResponseCache] = DEFAULT_CACHE):
         self.source_name = source_name
+        self.http = http or DEFAULT_CLIENT
+        self.cache = cache
         self.events = []
+        # Set by the pipeline for incremental runs: True for a page whose events
+        # were all listed before, where paging stops
+        self.known_page: Optional[Callable[[List[Dict[str, Any]]], bool]] = None
+        # Whether the last paged crawl saw the whole listing: pages of events up to
+        # an empty one, or the events on the only page of an unpaged source. A
+        # listing empty from page one, or cut off at max_pages, isn't
+        self.crawl_complete = False
     
     @abstractmethod
     def scrape(self) -> List[Dict[str, Any]]:
@@ -19,6 +50,176 @@ class BaseScraper(ABC):
         """
         pass
     
+    def fetch(self, url: str, timeout: float = 15, **kwargs) -> requests.Response:
+        """GET a page through the shared, rate-limited HTTP client"""
+        return self.http.get(url, timeout=timeout, **kwargs)
+    
+    def page_url(self, page: int) -> str:
+        """URL of a listing page, numbered from 1"""
+        return self.base_url
+    
+    def parse_page(self, content: bytes) -> List[Dict[str, Any]]:
+        """Extract events from one listing page"""
+        raise NotImplementedError(f"{type(self).__name__} does not parse listing pages")
+    
+    async def fetch_window(self, pages: range) -> List[Any]:
+        """
+        Fetch a window of listing pages concurrently on the HTTP client's fetch
+        threads; failures are returned, not raised
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.http.executor()
+        return await asyncio.gather(
+            *(loop.run_in_executor(executor, self.fetch_page, self.page_url(page), self.parse_page,
+                                   self.PAGE_TIMEOUT)
+              for page in pages),
+            return_exceptions=True
+        )
+    
+    def page_windows(self, max_pages: Optional[int] = None) -> Iterator[range]:
+        """Page numbers to fetch, PAGE_WINDOW at a time"""
+        max_pages = max_pages or self.MAX_PAGES
+        for first in range(1, max_pages + 1, self.PAGE_WINDOW):
+            yield range(first, min(first + self.PAGE_WINDOW, max_pages + 1))
+    
+    def accept_page(self, page: int, result: Any) -> bool:
+        """Report a fetched page; False means paging stops before it"""
+        if isinstance(result, Exception):
+            print(f"  Error scraping {self.source_name} page {page}: {result}")
+            return False
+        if result.status_code not in (200, 304):
+            print(f"  {self.source_name} returned status {result.status_code} for page {page}")
+            return False
+        if not result.events:
+            print(f"  No events found on page {page}")
+            return False
+        
+        cached = " (unchanged, cached)" if result.from_cache else ""
+        print(f"  Scraped page {page}, found {len(result.events)} events{cached}")
+        return True
+    
+    @staticmethod
+    def listing_ended(result: Any) -> bool:
+        """A page that came back fine but empty is the end of the listing, not a failure"""
+        return not isinstance(result, Exception) and result.status_code in (200, 304) and not result.events
+    
+    def unpaged(self, max_pages: Optional[int] = None) -> bool:
+        """Whether the source lists everything on one page, so a crawl of that page is whole"""
+        return self.MAX_PAGES == 1 and (max_pages or self.MAX_PAGES) == 1
+    
+    def stops_at(self, page: int, events: List[Dict[str, Any]]) -> bool:
+        """Whether paging ends early after this accepted page because its events are all known"""
+        if self.known_page is None or not self.known_page(events):
+            return False
+        print(f"  Page {page} of {self.source_name} holds only known events, stopping")
+        return True
+    
+    async def scrape_async(self, max_pages: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch listing pages concurrently, a window at a time, and return their events
+        in page order. Stops at the first page that fails or has no events, or after
+        a page known_page recognizes; pages fetched past it are discarded.
+        Concurrency is bounded by the HTTP client's global and per-host limits.
+        """
+        events = []
+        self.crawl_complete = False
+        
+        for pages in self.page_windows(max_pages):
+            results = await self.fetch_window(pages)
+            for page, result in zip(pages, results):
+                if not self.accept_page(page, result):
+                    self.crawl_complete = bool(events) and self.listing_ended(result)
+                    return events
+                events.extend(result.events)
+                if self.stops_at(page, result.events):
+                    return events
+        
+        self.crawl_complete = bool(events) and self.unpaged(max_pages)
+        return events
+    
+    def scrape_pages(self) -> List[Dict[str, Any]]:
+        """Synchronous wrapper around scrape_async"""
+        return asyncio.run(self.scrape_async())
+    
+    def iter_pages(self, max_pages: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming counterpart of scrape_async: yields each page's events as soon as
+        its window is fetched, so only one window of events is held at a time.
+        The next window is not requested until the consumer has taken this one.
+        """
+        self.crawl_complete = False
+        seen_events = False
+        
+        for pages in self.page_windows(max_pages):
+            results = asyncio.run(self.fetch_window(pages))
+            for page, result in zip(pages, results):
+                if not self.accept_page(page, result):
+                    self.crawl_complete = seen_events and self.listing_ended(result)
+                    return
+                seen_events = True
+                yield from result.events
+                if self.stops_at(page, result.events):
+                    return
+        
+        self.crawl_complete = seen_events and self.unpaged(max_pages)
+    
+    def iter_events(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield events as they are scraped. Scrapers that page through listings
+        override this to stream; the default runs scrape() and yields its result.
+        """
+        yield from self.scrape()
+    
+    def parser_key(self) -> str:
+        """Identifies the code that extracted cached events"""
+        return f"{type(self).__name__}:{self.PARSER_VERSION}"
+    
+    def fetch_page(self, url: str, parse: Callable[[bytes], List[Dict[str, Any]]],
+                   timeout: float = 15) -> PageResult:
+        """
+        Fetch a listing page and extract its events with parse(content).
+        With a cache, the request is conditional; on 304 Not Modified or an
+        unchanged body the previously extracted events are returned unparsed.
+        """
+        cached = self.cache.load(url) if self.cache else None
+        headers = cached.conditional_headers() if cached else {}
+        response = self.fetch(url, timeout=timeout, headers=headers)
+        
+        if response.status_code == 304 and cached:
+            if cached.parser == self.parser_key():
+                return PageResult(response.status_code, cached.events, True)
+            body = cached.body
+        elif response.status_code == 200:
+            body = response.content
+            if cached and cached.content_hash == content_hash(body) and cached.parser == self.parser_key():
+                self._store_page(url, response, body, cached.events, cached)
+                return PageResult(response.status_code, cached.events, True)
+        else:
+            return PageResult(response.status_code, [], False)
+        
+        events = self.run_parser(parse, body)
+        self._store_page(url, response, body, events, cached)
+        return PageResult(response.status_code, events, False)
+    
+    def run_parser(self, parse: Callable[[bytes], List[Dict[str, Any]]], body: bytes) -> List[Dict[str, Any]]:
+        """Run page parsing; subclasses may hand it to another process"""
+        return parse(body)
+    
+    def _store_page(self, url: str, response: requests.Response, body: bytes,
+                    events: List[Dict[str, Any]], cached: Optional[CachedResponse]):
+        if not self.cache:
+            return
+        previous = cached if response.status_code == 304 else None
+        self.cache.store(CachedResponse(
+            url=url,
+            etag=response.headers.get('ETag') or (previous.etag if previous else None),
+            last_modified=response.headers.get('Last-Modified') or (previous.last_modified if previous else None),
+            content_hash=content_hash(body),
+            body=body,
+            parser=self.parser_key(),
+            events=events
+        ))
+    
     def validate_event(self, event: Dict[str, Any]) -> bool:
         """Validate that an event has all required fields"""
         required_fields = ['title', 'start_datetime', 'venue_name', 'source_platform']
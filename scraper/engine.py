@@ -0,0 +1,240 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .base_scraper import BaseScraper
+from .extraction import Selector, parse_html, text
+
+
+# Substring -> neighborhood, checked in order; the first hit wins
+NEIGHBORHOODS = (
+    ('brooklyn', 'Brooklyn'),
+    ('bushwick', 'Bushwick'),
+    ('williamsburg', 'Williamsburg'),
+    ('greenpoint', 'Greenpoint'),
+    ('lower east side', 'Lower East Side'),
+    ('east village', 'East Village'),
+    ('west village', 'West Village'),
+    ('soho', 'SoHo'),
+    ('tribeca', 'Tribeca'),
+    ('chelsea', 'Chelsea'),
+    ('harlem', 'Harlem'),
+    ('upper west side', 'Upper West Side'),
+    ('upper east side', 'Upper East Side'),
+    ('midtown', 'Midtown'),
+    ('queens', 'Queens'),
+    ('astoria', 'Astoria'),
+    ('long island city', 'Long Island City'),
+)
+
+DEFAULT_NEIGHBORHOOD = 'Manhattan'
+
+PRICE_RE = re.compile(r'\d+(?:\.\d+)?')
+
+
+def extract_neighborhood(location_text: str) -> str:
+    """Extract neighborhood from location text"""
+    location_lower = location_text.lower()
+    for key, value in NEIGHBORHOODS:
+        if key in location_lower:
+            return value
+    return DEFAULT_NEIGHBORHOOD
+
+
+def parse_price(price_text: str, default: Tuple[Optional[float], Optional[float]] = (None, None)) -> tuple:
+    """Parse price text to extract min and max prices"""
+    if not price_text or 'free' in price_text.lower():
+        return 0.0, 0.0
+    
+    prices = PRICE_RE.findall(price_text)
+    if len(prices) >= 2:
+        return float(prices[0]), float(prices[1])
+    elif len(prices) == 1:
+        price = float(prices[0])
+        return price, price
+    
+    return default
+
+
+class SourceSpec(NamedTuple):
+    """
+    Everything that distinguishes one listing site from another. Selectors are
+    compiled when the spec is defined; SpecScraper interprets the rest.
+    """
+    name: str
+    label: str
+    base_url: str
+    link_base: str
+    cards: Selector
+    title: Selector
+    
+    # Paging: '?page=N' up to max_pages; page 1 may be the bare base_url
+    max_pages: int = 1
+    bare_first_page: bool = False
+    max_cards: Optional[int] = None
+    
+    # Cards without a title are skipped unless there is a default
+    default_title: Optional[str] = None
+    description: Optional[Selector] = None
+    default_description: str = 'Event in New York City'
+    description_limit: Optional[int] = 500
+    
+    # Start time comes from <time datetime>. Otherwise the event is dated now if
+    # the date selector matches (or always, if start_required is False).
+    start_time: Selector = Selector('time')
+    date: Optional[Selector] = None
+    start_required: bool = True
+    
+    # Venue and neighborhood are fixed for single-venue sites, otherwise taken
+    # from the location text ("Venue, address..."); a location without a comma
+    # is the venue itself only if bare_location_is_venue
+    location: Optional[Selector] = None
+    default_location: str = 'New York, NY'
+    venue_name: Optional[str] = None
+    neighborhood: Optional[str] = None
+    bare_location_is_venue: bool = True
+    
+    price: Optional[Selector] = None
+    default_price_text: str = 'Free'
+    default_price: Tuple[Optional[float], Optional[float]] = (None, None)
+    
+    link: Selector = Selector('a[href]')
+    link_to_base_url: bool = False
+    
+    # Tags every event gets, plus (tag, title keywords) rules
+    base_tags: Tuple[str, ...] = ()
+    tag_rules: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+
+
+class SpecScraper(BaseScraper):
+    """Scraper for any listing site described by a SourceSpec"""
+    
+    PARSER_VERSION = 2
+    
+    SPEC: Optional[SourceSpec] = None
+    
+    def __init__(self, spec: Optional[SourceSpec] = None, **kwargs):
+        self.spec = spec or self.SPEC
+        super().__init__(self.spec.name, **kwargs)
+        self.base_url = self.spec.base_url
+        self.MAX_PAGES = self.spec.max_pages
+        # Set to a scraper.parsing.ParserPool to parse pages in worker processes
+        self.parser_pool = None
+    
+    def parser_key(self) -> str:
+        return f"{super().parser_key()}:{self.spec.name}"
+    
+    def page_url(self, page: int) -> str:
+        """URL of a listing page, numbered from 1"""
+        if self.spec.max_pages == 1 or (page == 1 and self.spec.bare_first_page):
+            return self.base_url
+        return f"{self.base_url}?page={page}"
+    
+    def run_parser(self, parse, body: bytes) -> List[Dict[str, Any]]:
+        if self.parser_pool is not None and parse == self.parse_page:
+            return self.parser_pool.parse(self.spec, body)
+        return parse(body)
+    
+    def parse_page(self, content: bytes) -> List[Dict[str, Any]]:
+        """Extract events from one listing page"""
+        cards = self.spec.cards.all(parse_html(content))
+        if self.spec.max_cards is not None:
+            cards = cards[:self.spec.max_cards]
+        
+        events = []
+        for card in cards:
+            try:
+                event = self.parse_card(card)
+                if event:
+                    events.append(event)
+            except Exception as e:
+                print(f"  Error parsing {self.spec.label} event card: {e}")
+        
+        return events
+    
+    def parse_card(self, card) -> Optional[Dict[str, Any]]:
+        """Build one event from a card node, or None if the card isn't an event"""
+        spec = self.spec
+        
+        title = text(spec.title.first(card)) or spec.default_title
+        if not title:
+            return None
+        
+        desc_elem = spec.description.first(card) if spec.description else None
+        description = text(desc_elem)[:spec.description_limit] if desc_elem is not None else spec.default_description
+        
+        time_elem = spec.start_time.first(card)
+        start_datetime = time_elem.get('datetime') if time_elem is not None else None
+        if not start_datetime:
+            if spec.start_required and (spec.date is None or spec.date.first(card) is None):
+                return None
+            start_datetime = datetime.now().isoformat()
+        
+        location_elem = spec.location.first(card) if spec.location else None
+        location_text = text(location_elem) if location_elem is not None else spec.default_location
+        venue_name = spec.venue_name or self.venue_from_location(location_text)
+        neighborhood = spec.neighborhood or extract_neighborhood(location_text)
+        
+        price_elem = spec.price.first(card) if spec.price else None
+        price_text = (text(price_elem) if price_elem is not None else '') or spec.default_price_text
+        price_min, price_max = parse_price(price_text, spec.default_price)
+        
+        link_elem = card if card.tag == 'a' else spec.link.first(card)
+        url = link_elem.get('href') if link_elem is not None else None
+        if not url and spec.link_to_base_url:
+            url = self.base_url
+        if url and not url.startswith('http'):
+            url = f"{spec.link_base}{url}"
+        
+        title_lower = title.lower()
+        raw_tags = list(spec.base_tags)
+        for tag, keywords in spec.tag_rules:
+            if any(keyword in title_lower for keyword in keywords):
+                raw_tags.append(tag)
+        
+        return self.create_event(
+            title=title,
+            description=description,
+            start_datetime=start_datetime,
+            venue_name=venue_name,
+            neighborhood=neighborhood,
+            city='New York',
+            price_min=price_min,
+            price_max=price_max,
+            url=url,
+            raw_tags=raw_tags
+        )
+    
+    def venue_from_location(self, location_text: str) -> str:
+        """Venue name from "Venue, address..." location text"""
+        if ',' in location_text:
+            venue_name = location_text.split(',')[0].strip()
+        elif self.spec.bare_location_is_venue:
+            venue_name = location_text.strip()
+        else:
+            venue_name = ''
+        
+        if not venue_name or venue_name == 'New York':
+            return 'TBD'
+        return venue_name
+    
+    def scrape(self) -> List[Dict[str, Any]]:
+        """
+        Scrape events from the source.
+        Pages are fetched concurrently until one comes back empty, up to max_pages.
+        """
+        self.clear_events()
+        
+        try:
+            self.events = self.scrape_pages()
+        except Exception as e:
+            print(f"Error scraping {self.spec.label}: {e}")
+        
+        return self.events
+    
+    def iter_events(self) -> Iterator[Dict[str, Any]]:
+        """Yield events page by page instead of collecting them in self.events"""
+        try:
+            yield from self.iter_pages()
+        except Exception as e:
+            print(f"Error scraping {self.spec.label}: {e}")
@@ -0,0 +1,69 @@
+import re
+from typing import List, Optional
+from lxml import etree, html
+
+
+# Pattern syntax: tag, tag.class, tag[attr] or tag[attr=value]
+PATTERN_RE = re.compile(r'^(?P<tag>[\w*-]+)(?:\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)(?:=(?P<value>[^\]]+))?\])?$')
+
+
+def pattern_xpath(pattern: str) -> str:
+    """
+    Translate a simple element pattern into a descendant XPath with the same
+    matching rules as BeautifulSoup's find_all (class_ matches any class token)
+    """
+    match = PATTERN_RE.match(pattern.strip())
+    if not match:
+        raise ValueError(f"Unsupported selector pattern: {pattern}")
+    
+    xpath = f".//{match['tag']}"
+    if match['cls']:
+        xpath += f"[contains(concat(' ', normalize-space(@class), ' '), ' {match['cls']} ')]"
+    elif match['attr'] and match['value'] is not None:
+        xpath += f"[@{match['attr']}='{match['value']}']"
+    elif match['attr']:
+        xpath += f"[@{match['attr']}]"
+    return xpath
+
+
+class Selector:
+    """
+    An ordered chain of fallback patterns, compiled to XPath once per source.
+    Like `find_all(a) or find_all(b) or ...`, the first pattern with any
+    match wins, but each pattern is a single indexed lxml query.
+    """
+    
+    def __init__(self, *patterns: str):
+        self.patterns = patterns
+        self.queries = [etree.XPath(pattern_xpath(p)) for p in patterns]
+    
+    def __reduce__(self):
+        # Compiled XPath objects can't be pickled; rebuild from the patterns
+        return Selector, self.patterns
+    
+    def all(self, node) -> List[html.HtmlElement]:
+        """Every match of the first pattern that matches, in document order"""
+        for query in self.queries:
+            found = query(node)
+            if found:
+                return found
+        return []
+    
+    def first(self, node) -> Optional[html.HtmlElement]:
+        """First match of the first pattern that matches, like `find(a) or find(b)`"""
+        found = self.all(node)
+        return found[0] if found else None
+
+
+def parse_html(content: bytes) -> html.HtmlElement:
+    """Parse a page with lxml's HTML parser"""
+    if not content or not content.strip():
+        return html.fromstring('<html></html>')
+    return html.document_fromstring(content)
+
+
+def text(node: Optional[html.HtmlElement]) -> str:
+    """Element text with each fragment stripped, like BeautifulSoup's get_text(strip=True)"""
+    if node is None:
+        return ''
+    return ''.join(fragment.strip() for fragment in node.itertext())
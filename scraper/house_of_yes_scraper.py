@@ -1,90 +1,8 @@
-from .base_scraper import BaseScraper
-from typing import List, Dict, Any
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
+from .engine import SpecScraper
+from .sources import HOUSE_OF_YES
 
 
-class HouseOfYesScraper(BaseScraper):
+class HouseOfYesScraper(SpecScraper):
     """Scraper for House of Yes events"""
     
-    def __init__(self):
-        super().__init__('house_of_yes')
-        self.base_url = 'https://www.houseofyes.org/events'
-    
-    def scrape(self) -> List[Dict[str, Any]]:
-        """
-        Scrape events from House of Yes website.
-        Note: This is a placeholder implementation that demonstrates the structure.
-        """
-        self.clear_events()
-        
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(self.base_url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                event_items = soup.find_all('div', class_='event') or soup.find_all('article', class_='event-card')
-                
-                for item in event_items[:10]:
-                    try:
-                        title_elem = item.find('h2') or item.find('h3') or item.find('h1')
-                        title = title_elem.get_text(strip=True) if title_elem else 'House of Yes Event'
-                        
-                        desc_elem = item.find('div', class_='description') or item.find('p')
-                        description = desc_elem.get_text(strip=True) if desc_elem else 'Immersive nightlife experience at House of Yes'
-                        
-                        time_elem = item.find('time') or item.find('div', class_='date')
-                        start_datetime = time_elem.get('datetime') if time_elem and time_elem.get('datetime') else datetime.now().isoformat()
-                        
-                        venue_name = 'House of Yes'
-                        neighborhood = 'Bushwick'
-                        city = 'New York'
-                        
-                        price_elem = item.find('span', class_='price') or item.find('div', class_='price')
-                        price_text = price_elem.get_text(strip=True) if price_elem else '$20-40'
-                        
-                        price_min = 20.0
-                        price_max = 40.0
-                        if price_text and '$' in price_text:
-                            import re
-                            prices = re.findall(r'\d+', price_text)
-                            if len(prices) >= 2:
-                                price_min = float(prices[0])
-                                price_max = float(prices[1])
-                            elif len(prices) == 1:
-                                price_min = price_max = float(prices[0])
-                        
-                        link_elem = item.find('a', href=True)
-                        url = link_elem['href'] if link_elem else self.base_url
-                        if not url.startswith('http'):
-                            url = f"https://www.houseofyes.org{url}"
-                        
-                        raw_tags = ['nightlife', 'house_of_yes', 'immersive', 'performance', 'brooklyn', 'dance']
-                        
-                        event = self.create_event(
-                            title=title,
-                            description=description,
-                            start_datetime=start_datetime,
-                            venue_name=venue_name,
-                            neighborhood=neighborhood,
-                            city=city,
-                            price_min=price_min,
-                            price_max=price_max,
-                            url=url,
-                            raw_tags=raw_tags
-                        )
-                        self.events.append(event)
-                    except Exception as e:
-                        print(f"Error parsing House of Yes event: {e}")
-                        continue
-            
-        except Exception as e:
-            print(f"Error scraping House of Yes: {e}")
-        
-        return self.events
+    SPEC = HOUSE_OF_YES
@@ -0,0 +1,155 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, bursts of up to capacity"""
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns the seconds waited."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class HttpClient:
+    """
+    HTTP access shared by all scrapers: keep-alive sessions (one per thread, since
+    requests.Session isn't guaranteed thread-safe) over one shared set of connection
+    pools, retries with exponential backoff on 429/5xx, shared default headers, and
+    a per-host token bucket so concurrent scrapers stay within each site's limits.
+    In-flight requests are capped globally and per host, whichever thread or event
+    loop issues them. Async callers fetch on the client's own long-lived threads
+    (see executor), so sessions are reused across pages and runs.
+    """
+    
+    def __init__(self, requests_per_second: float = 1.0, burst: float = 2.0,
+                 retries: int = 3, backoff_factor: float = 0.5, pool_size: int = 10,
+                 headers: Optional[Dict[str, str]] = None,
+                 host_limits: Optional[Dict[str, float]] = None,
+                 max_connections: int = 16, max_connections_per_host: int = 4):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_size = max(pool_size, max_connections_per_host)
+        self.headers = dict(DEFAULT_HEADERS if headers is None else headers)
+        self.host_limits = dict(host_limits or {})
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._host_slots = {}
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._generation = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.adapter = self._make_adapter()
+    
+    def _make_adapter(self) -> HTTPAdapter:
+        """Retrying adapter whose per-host connection pools every session shares"""
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        return HTTPAdapter(max_retries=retry, pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+    
+    def session(self) -> requests.Session:
+        """This thread's session, created on first use"""
+        session = getattr(self._local, 'session', None)
+        if session is None or self._local.generation != self._generation:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            with self._buckets_lock:
+                self._sessions.append(session)
+                self._local.generation = self._generation
+            self._local.session = session
+        return session
+    
+    def executor(self) -> ThreadPoolExecutor:
+        """Long-lived fetch threads for async callers, created on first use"""
+        with self._buckets_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix='http')
+            return self._executor
+    
+    def bucket(self, host: str) -> TokenBucket:
+        """The rate limiter for a host, shared across threads"""
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate = self.host_limits.get(host, self.requests_per_second)
+                bucket = self._buckets[host] = TokenBucket(rate, max(1.0, self.burst))
+            return bucket
+    
+    def host_slots(self, host: str) -> threading.BoundedSemaphore:
+        """The in-flight request limit for a host, shared across threads"""
+        with self._buckets_lock:
+            slots = self._host_slots.get(host)
+            if slots is None:
+                slots = self._host_slots[host] = threading.BoundedSemaphore(self.max_connections_per_host)
+            return slots
+    
+    def get(self, url: str, timeout: float = 15, **kwargs) -> requests.Response:
+        """Rate-limited GET through this thread's session"""
+        host = urlsplit(url).netloc.lower()
+        self.bucket(host).acquire()
+        with self._slots, self.host_slots(host):
+            return self.session().get(url, timeout=timeout, **kwargs)
+    
+    def close(self):
+        """
+        Stop the fetch threads and close every session and connection pool.
+        The client can still be used afterwards.
+        """
+        with self._buckets_lock:
+            executor, self._executor = self._executor, None
+            sessions, self._sessions = self._sessions, []
+            self._generation += 1
+        
+        if executor is not None:
+            executor.shutdown(wait=True)
+        for session in sessions:
+            session.close()
+        self.adapter.close()
+
+
+DEFAULT_CLIENT = HttpClient()
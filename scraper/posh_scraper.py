@@ -1,74 +1,8 @@
-from .base_scraper import BaseScraper
-from typing import List, Dict, Any
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
+from .engine import SpecScraper
+from .sources import POSH
 
 
-class PoshScraper(BaseScraper):
+class PoshScraper(SpecScraper):
     """Scraper for Posh events"""
     
-    def __init__(self):
-        super().__init__('posh')
-        self.base_url = 'https://www.posh.vip/events'
-    
-    def scrape(self) -> List[Dict[str, Any]]:
-        """
-        Scrape events from Posh.
-        Note: This is a placeholder implementation that demonstrates the structure.
-        """
-        self.clear_events()
-        
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(self.base_url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                event_items = soup.find_all('div', class_='event-item') or soup.find_all('article')
-                
-                for item in event_items[:10]:
-                    try:
-                        title_elem = item.find('h2') or item.find('h3') or item.find('h4')
-                        title = title_elem.get_text(strip=True) if title_elem else 'Posh Event'
-                        
-                        desc_elem = item.find('p', class_='description') or item.find('p')
-                        description = desc_elem.get_text(strip=True) if desc_elem else 'Exclusive nightlife experience'
-                        
-                        time_elem = item.find('time') or item.find('span', class_='date')
-                        datetime_str = time_elem.get('datetime') if time_elem and time_elem.get('datetime') else datetime.now().isoformat()
-                        
-                        location = 'New York, NY'
-                        
-                        price_elem = item.find('span', class_='price')
-                        price = price_elem.get_text(strip=True) if price_elem else 'See website'
-                        
-                        link_elem = item.find('a', href=True)
-                        url = link_elem['href'] if link_elem else self.base_url
-                        if not url.startswith('http'):
-                            url = f"https://www.posh.vip{url}"
-                        
-                        tags = ['nightlife', 'posh', 'exclusive']
-                        
-                        event = self.create_event(
-                            title=title,
-                            description=description,
-                            datetime_str=datetime_str,
-                            location=location,
-                            price=price,
-                            url=url,
-                            tags=tags
-                        )
-                        self.events.append(event)
-                    except Exception as e:
-                        print(f"Error parsing Posh event: {e}")
-                        continue
-            
-        except Exception as e:
-            print(f"Error scraping Posh: {e}")
-        
-        return self.events
+    SPEC = POSH
@@ -0,0 +1,84 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+class CachedResponse(NamedTuple):
+    """A stored listing page: validators, body, and the events extracted from it"""
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+    body: bytes
+    parser: str
+    events: List[Dict[str, Any]]
+    
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+def content_hash(body: bytes) -> str:
+    """Stable fingerprint of a response body"""
+    return hashlib.sha256(body).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk cache of scraped pages keyed by URL, one gzip-compressed JSON file
+    per URL. Writes go to a temp file and are renamed into place, so concurrent
+    scrapers never read a half-written entry.
+    """
+    
+    def __init__(self, cache_dir: str = './data/http_cache'):
+        self.cache_dir = cache_dir
+    
+    def path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest() + '.json.gz')
+    
+    def load(self, url: str) -> Optional[CachedResponse]:
+        """The stored entry for url, or None if missing or unreadable"""
+        try:
+            with gzip.open(self.path(url), 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if data.get('url') != url:
+            return None
+        data['body'] = data['body'].encode('latin-1')
+        return CachedResponse(**data)
+    
+    def store(self, entry: CachedResponse):
+        """Write an entry, replacing any previous one for the same URL"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data = entry._asdict()
+        data['body'] = entry.body.decode('latin-1')
+        
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path(entry.url))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    def clear(self):
+        """Remove every cached entry"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json.gz'):
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+DEFAULT_CACHE = ResponseCache()
@@ -1,90 +1,8 @@
-from .base_scraper import BaseScraper
-from typing import List, Dict, Any
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
+from .engine import SpecScraper
+from .sources import SLIPPER_ROOM
 
 
-class SlipperRoomScraper(BaseScraper):
+class SlipperRoomScraper(SpecScraper):
     """Scraper for Slipper Room events"""
     
-    def __init__(self):
-        super().__init__('slipper_room')
-        self.base_url = 'https://www.slipperroom.com/calendar'
-    
-    def scrape(self) -> List[Dict[str, Any]]:
-        """
-        Scrape events from Slipper Room website.
-        Note: This is a placeholder implementation that demonstrates the structure.
-        """
-        self.clear_events()
-        
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(self.base_url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                event_items = soup.find_all('div', class_='event-listing') or soup.find_all('li', class_='event')
-                
-                for item in event_items[:10]:
-                    try:
-                        title_elem = item.find('h2') or item.find('h3') or item.find('span', class_='title')
-                        title = title_elem.get_text(strip=True) if title_elem else 'Slipper Room Show'
-                        
-                        desc_elem = item.find('div', class_='description') or item.find('p')
-                        description = desc_elem.get_text(strip=True) if desc_elem else 'Burlesque and variety show at Slipper Room'
-                        
-                        time_elem = item.find('time') or item.find('span', class_='date')
-                        start_datetime = time_elem.get('datetime') if time_elem and time_elem.get('datetime') else datetime.now().isoformat()
-                        
-                        venue_name = 'Slipper Room'
-                        neighborhood = 'Lower East Side'
-                        city = 'New York'
-                        
-                        price_elem = item.find('span', class_='price')
-                        price_text = price_elem.get_text(strip=True) if price_elem else '$15-25'
-                        
-                        price_min = 15.0
-                        price_max = 25.0
-                        if price_text and '$' in price_text:
-                            import re
-                            prices = re.findall(r'\d+', price_text)
-                            if len(prices) >= 2:
-                                price_min = float(prices[0])
-                                price_max = float(prices[1])
-                            elif len(prices) == 1:
-                                price_min = price_max = float(prices[0])
-                        
-                        link_elem = item.find('a', href=True)
-                        url = link_elem['href'] if link_elem else self.base_url
-                        if not url.startswith('http'):
-                            url = f"https://www.slipperroom.com{url}"
-                        
-                        raw_tags = ['nightlife', 'slipper_room', 'burlesque', 'variety', 'lower_east_side', 'performance']
-                        
-                        event = self.create_event(
-                            title=title,
-                            description=description,
-                            start_datetime=start_datetime,
-                            venue_name=venue_name,
-                            neighborhood=neighborhood,
-                            city=city,
-                            price_min=price_min,
-                            price_max=price_max,
-                            url=url,
-                            raw_tags=raw_tags
-                        )
-                        self.events.append(event)
-                    except Exception as e:
-                        print(f"Error parsing Slipper Room event: {e}")
-                        continue
-            
-        except Exception as e:
-            print(f"Error scraping Slipper Room: {e}")
-        
-        return self.events
+    SPEC = SLIPPER_ROOM
@@ -0,0 +1,135 @@
+from .engine import SourceSpec
+from .extraction import Selector
+
+
+EVENTBRITE = SourceSpec(
+    name='eventbrite',
+    label='Eventbrite',
+    base_url='https://www.eventbrite.com/d/ny--new-york/nightlife/',
+    link_base='https://www.eventbrite.com',
+    max_pages=10,
+    cards=Selector('div.discover-search-desktop-card', 'article.event-card', 'div[data-testid=event-card]'),
+    title=Selector('h3', 'h2', 'div.event-card__title'),
+    description=Selector('p.event-card__description', 'div.event-card-description'),
+    date=Selector('div.event-card__date'),
+    location=Selector('div.event-card__location', 'p.location-info'),
+    bare_location_is_venue=False,
+    price=Selector('div.event-card__price', 'span.price'),
+    base_tags=('nightlife', 'eventbrite', 'nyc'),
+    tag_rules=(
+        ('music', ('music', 'concert')),
+        ('dance', ('dance', 'party')),
+        ('comedy', ('comedy',)),
+    ),
+)
+
+SHOTGUN = SourceSpec(
+    name='shotgun',
+    label='Shotgun',
+    base_url='https://shotgun.live/en-us/events/new-york',
+    link_base='https://shotgun.live',
+    max_pages=10,
+    bare_first_page=True,
+    cards=Selector('div.event-card', 'article.event', 'a.event-link', 'div[data-testid=event-item]'),
+    title=Selector('h2', 'h3', 'div.event-title', 'span.title'),
+    description=Selector('p.event-description', 'div.description'),
+    date=Selector('div.event-date', 'span.date'),
+    location=Selector('div.event-location', 'span.location', 'p.venue'),
+    price=Selector('div.event-price', 'span.price'),
+    base_tags=('nightlife', 'shotgun', 'nyc'),
+    tag_rules=(
+        ('music', ('music', 'concert', 'dj')),
+        ('dance', ('dance', 'party', 'club')),
+        ('electronic', ('techno', 'house')),
+        ('art', ('art', 'gallery')),
+    ),
+)
+
+VIEWCY = SourceSpec(
+    name='viewcy',
+    label='Viewcy',
+    base_url='https://viewcy.com/events/new-york',
+    link_base='https://viewcy.com',
+    max_pages=10,
+    bare_first_page=True,
+    cards=Selector('div.event-card', 'article.event', 'div.event-item', 'a.event-link'),
+    title=Selector('h2', 'h3', 'div.event-title', 'span.title'),
+    description=Selector('p.event-description', 'div.description', 'p'),
+    date=Selector('div.event-date', 'span.date', 'div.date'),
+    location=Selector('div.event-location', 'span.location', 'div.venue', 'p.location'),
+    price=Selector('div.event-price', 'span.price', 'div.price'),
+    base_tags=('nightlife', 'viewcy', 'nyc'),
+    tag_rules=(
+        ('music', ('music', 'concert', 'live')),
+        ('dance', ('dance', 'party', 'club')),
+        ('art', ('art', 'gallery', 'exhibition')),
+        ('comedy', ('comedy', 'stand-up')),
+        ('food', ('food', 'dining')),
+    ),
+)
+
+HOUSE_OF_YES = SourceSpec(
+    name='house_of_yes',
+    label='House of Yes',
+    base_url='https://www.houseofyes.org/events',
+    link_base='https://www.houseofyes.org',
+    max_cards=10,
+    cards=Selector('div.event', 'article.event-card'),
+    title=Selector('h2', 'h3', 'h1'),
+    default_title='House of Yes Event',
+    description=Selector('div.description', 'p'),
+    default_description='Immersive nightlife experience at House of Yes',
+    description_limit=None,
+    start_required=False,
+    venue_name='House of Yes',
+    neighborhood='Bushwick',
+    price=Selector('span.price', 'div.price'),
+    default_price_text='$20-40',
+    default_price=(20.0, 40.0),
+    link_to_base_url=True,
+    base_tags=('nightlife', 'house_of_yes', 'immersive', 'performance', 'brooklyn', 'dance'),
+)
+
+SLIPPER_ROOM = SourceSpec(
+    name='slipper_room',
+    label='Slipper Room',
+    base_url='https://www.slipperroom.com/calendar',
+    link_base='https://www.slipperroom.com',
+    max_cards=10,
+    cards=Selector('div.event-listing', 'li.event'),
+    title=Selector('h2', 'h3', 'span.title'),
+    default_title='Slipper Room Show',
+    description=Selector('div.description', 'p'),
+    default_description='Burlesque and variety show at Slipper Room',
+    description_limit=None,
+    start_required=False,
+    venue_name='Slipper Room',
+    neighborhood='Lower East Side',
+    price=Selector('span.price'),
+    default_price_text='$15-25',
+    default_price=(15.0, 25.0),
+    link_to_base_url=True,
+    base_tags=('nightlife', 'slipper_room', 'burlesque', 'variety', 'lower_east_side', 'performance'),
+)
+
+POSH = SourceSpec(
+    name='posh',
+    label='Posh',
+    base_url='https://www.posh.vip/events',
+    link_base='https://www.posh.vip',
+    max_cards=10,
+    cards=Selector('div.event-item', 'article'),
+    title=Selector('h2', 'h3', 'h4'),
+    default_title='Posh Event',
+    description=Selector('p.description', 'p'),
+    default_description='Exclusive nightlife experience',
+    description_limit=None,
+    start_required=False,
+    price=Selector('span.price'),
+    default_price_text='See website',
+    link_to_base_url=True,
+    base_tags=('nightlife', 'posh', 'exclusive'),
+)
+
+# Every listing source by source_platform name
+SOURCES = {spec.name: spec for spec in (EVENTBRITE, SHOTGUN, VIEWCY, HOUSE_OF_YES, SLIPPER_ROOM, POSH)}
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark listing-page parsing over the saved HTML fixtures.
+
+Compares the previous approach (BeautifulSoup with html.parser and chained
+find_all/find fallbacks) against the lxml extraction layer, running the same
+card and field lookups for each scraper.
+
+    python tests/bench_parsing.py [repeats]
+"""
+
+import sys
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scraper import EventbriteScraper, ShotgunScraper, ViewcyScraper, HouseOfYesScraper, SlipperRoomScraper
+from scraper.extraction import PATTERN_RE, parse_html, text
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+SCRAPERS = {
+    'eventbrite': EventbriteScraper,
+    'shotgun': ShotgunScraper,
+    'viewcy': ViewcyScraper,
+    'house_of_yes': HouseOfYesScraper,
+    'slipper_room': SlipperRoomScraper,
+}
+
+
+def soup_query(pattern):
+    """find_all/find arguments equivalent to an extraction pattern"""
+    match = PATTERN_RE.match(pattern)
+    kwargs = {}
+    if match['cls']:
+        kwargs['class_'] = match['cls']
+    elif match['attr']:
+        kwargs['attrs'] = {match['attr']: match['value'] if match['value'] is not None else True}
+    return match['tag'], kwargs
+
+
+def field_selectors(scraper):
+    spec = scraper.spec
+    fields = (spec.title, spec.description, spec.start_time, spec.date, spec.location, spec.price, spec.link)
+    return [selector for selector in fields if selector is not None]
+
+
+def soup_extract(content, scraper):
+    """The old way: full html.parser tree, one full scan per fallback"""
+    soup = BeautifulSoup(content, 'html.parser')
+    cards = []
+    for pattern in scraper.spec.cards.patterns:
+        tag, kwargs = soup_query(pattern)
+        cards = soup.find_all(tag, **kwargs)
+        if cards:
+            break
+    
+    values = []
+    for card in cards:
+        for selector in field_selectors(scraper):
+            found = None
+            for pattern in selector.patterns:
+                tag, kwargs = soup_query(pattern)
+                found = card.find(tag, **kwargs)
+                if found:
+                    break
+            values.append(found.get_text(strip=True) if found else None)
+    return values
+
+
+def lxml_extract(content, scraper):
+    """The new way: lxml tree and compiled XPath fallbacks"""
+    root = parse_html(content)
+    values = []
+    for card in scraper.spec.cards.all(root):
+        for selector in field_selectors(scraper):
+            found = selector.first(card)
+            values.append(text(found) if found is not None else None)
+    return values
+
+
+def timed(fn, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    
+    print(f"{'source':<14}{'KB':>6}{'soup ms':>10}{'lxml ms':>10}{'speedup':>9}{'parse_page ms':>15}")
+    for name, scraper_class in SCRAPERS.items():
+        with open(os.path.join(FIXTURES_DIR, f'{name}.html'), 'rb') as f:
+            content = f.read()
+        scraper = scraper_class()
+        
+        assert soup_extract(content, scraper) == lxml_extract(content, scraper)
+        
+        before = timed(lambda: soup_extract(content, scraper), repeats)
+        after = timed(lambda: lxml_extract(content, scraper), repeats)
+        full = timed(lambda: scraper.parse_page(content), repeats)
+        print(f"{name:<14}{len(content) / 1024:>6.0f}{before:>10.2f}{after:>10.2f}{before / after:>8.1f}x{full:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite database layer
+"""
+
+import gc
+import sys
+import os
+import sqlite3
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.database import Database, event_fingerprint
+from utils.event_cache import EventCache
+
+
+def make_event(title, start_datetime, **overrides):
+    """Build an event dict in the scraper output format"""
+    event = {
+        'title': title,
+        'description': f'{title} description',
+        'start_datetime': start_datetime,
+        'end_datetime': None,
+        'venue_name': 'House of Yes',
+        'neighborhood': 'Bushwick',
+        'city': 'New York',
+        'price_min': 20.0,
+        'price_max': 40.0,
+        'url': 'https://example.com/event',
+        'source_platform': 'test',
+        'raw_tags': ['nightlife', 'dance'],
+    }
+    event.update(overrides)
+    return event
+
+
+def test_connection_is_reused_per_thread(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    
+    assert db.get_connection() is db.get_connection()
+    
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db.get_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not db.get_connection()
+    
+    mode = db.get_connection().execute('PRAGMA journal_mode').fetchone()[0]
+    assert mode.lower() == 'wal'
+    db.close()
+
+
+def test_concurrent_writers_lose_no_rows(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    
+    def write(worker):
+        for batch in range(10):
+            db.insert_events([make_event(f'Show {worker}-{batch}-{i}', '2025-11-20T22:00:00') for i in range(50)])
+    
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert db.get_event_count() == 4 * 10 * 50
+    db.close()
+
+
+def test_connection_is_closed_when_its_thread_ends(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db.get_connection()))
+    thread.start()
+    thread.join()
+    del thread
+    gc.collect()
+    
+    with pytest.raises(sqlite3.ProgrammingError):
+        other[0].execute('SELECT 1')
+    db.close()
+
+
+def test_close_and_reopen(tmp_path):
+    with Database(str(tmp_path / 'events.db')) as db:
+        conn = db.get_connection()
+        db.insert_event(make_event('Cosmic Disco', '2025-11-20T22:00:00'))
+    
+    assert db.get_connection() is not conn
+    assert db.get_event_count() == 1
+    db.close()
+
+
+def test_insert_events_reports_counts_per_source(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    db.insert_event(make_event('Cosmic Disco', '2025-11-20T22:00:00'))
+    
+    events = [
+        make_event('Cosmic Disco', '2025-11-20T22:00:00'),
+        make_event('Burlesque Brunch', '2025-11-20T12:00:00'),
+        make_event('Techno Night', '2025-11-20T23:00:00', source_platform='shotgun'),
+        make_event('', '2025-11-20T23:00:00', source_platform='shotgun'),
+    ]
+    result = db.insert_events(events, chunk_size=2)
+    
+    assert result['inserted'] == 2
+    assert result['ignored'] == 1
+    assert result['failed'] == 1
+    assert result['by_source']['test'] == {'inserted': 1, 'updated': 0, 'ignored': 1, 'failed': 0}
+    assert result['by_source']['shotgun'] == {'inserted': 1, 'updated': 0, 'ignored': 0, 'failed': 1}
+    assert result['failed_keys'] == [event_fingerprint(events[3])]
+    assert db.get_event_count() == 3
+    db.close()
+
+
+def test_insert_events_raises_errors_that_are_not_about_a_row(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    db.insert_event(make_event('Cosmic Disco', '2025-11-20T22:00:00'))
+    conn = db.get_connection()
+    conn.execute(f"PRAGMA max_page_count = {conn.execute('PRAGMA page_count').fetchone()[0]}")
+    events = [make_event(f'Show {i}', '2025-11-20T22:00:00', description='x' * 2000) for i in range(50)]
+    
+    # A full disk fails every row alike, so it isn't retried row by row and counted as bad rows
+    with pytest.raises(sqlite3.OperationalError):
+        db.insert_events(events)
+    assert db.get_event_count() == 1
+    db.close()
+
+
+def test_upsert_only_rewrites_changed_events(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    events = [
+        make_event('Cosmic Disco', '2025-11-20T22:00:00'),
+        make_event('Burlesque Brunch', '2025-11-20T12:00:00'),
+    ]
+    db.insert_events(events, mode='upsert')
+    
+    changed = [
+        make_event('Cosmic Disco', '2025-11-20T22:00:00', price_min=30.0),
+        make_event('Burlesque Brunch', '2025-11-20T12:00:00'),
+        make_event('Burlesque Brunch', '2025-11-20T12:00:00', price_min=5.0, source_platform='shotgun'),
+    ]
+    result = db.insert_events(changed, mode='upsert')
+    
+    assert (result['inserted'], result['updated'], result['ignored']) == (0, 1, 2)
+    stored = {event['title']: event for event in db.get_events()}
+    assert stored['Cosmic Disco']['price_min'] == 30.0
+    assert stored['Cosmic Disco']['updated_at'] is not None
+    assert stored['Burlesque Brunch']['price_min'] == 20.0
+    db.close()
+
+
+def test_fingerprints_filter_unchanged_events(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    events = [
+        make_event('Cosmic Disco', '2025-11-20T22:00:00'),
+        make_event('Burlesque Brunch', '2025-11-20T12:00:00'),
+    ]
+    assert db.filter_unseen_events(events) == events
+    db.record_fingerprints(events)
+    
+    later = [
+        make_event('COSMIC DISCO ', '2025-11-20T22:00:00', description='Cosmic Disco description'),
+        make_event('Burlesque Brunch', '2025-11-20T12:00:00', price_min=5.0),
+        make_event('Cosmic Disco', '2025-11-20T23:00:00'),
+        make_event('Techno Night', '2025-11-20T23:00:00'),
+    ]
+    fresh = db.filter_unseen_events(later, chunk_size=3)
+    
+    assert [(e['title'], e['start_datetime']) for e in fresh] == [
+        ('Burlesque Brunch', '2025-11-20T12:00:00'),
+        ('Cosmic Disco', '2025-11-20T23:00:00'),
+        ('Techno Night', '2025-11-20T23:00:00'),
+    ]
+    
+    db.clear_all_events()
+    assert db.filter_unseen_events(events) == events
+    db.close()
+
+
+def test_get_events_uses_local_day_range(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    db.insert_events([
+        make_event('Early Show', '2025-11-20T00:30:00'),
+        make_event('Late Show', '2025-11-20T23:30:00'),
+        make_event('Offset Show', '2025-11-21T03:00:00+00:00'),
+        make_event('Next Day', '2025-11-21T00:00:00'),
+    ])
+    
+    titles = [event['title'] for event in db.get_events(date='2025-11-20')]
+    assert titles == ['Early Show', 'Offset Show', 'Late Show']
+    
+    between = db.get_events_between('2025-11-20T22:00:00', '2025-11-21T00:00:00')
+    assert [event['title'] for event in between] == ['Offset Show', 'Late Show']
+    db.close()
+
+
+def test_get_events_with_malformed_date_matches_nothing(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    db.insert_event(make_event('Cosmic Disco', '2025-11-20T22:00:00'))
+    
+    assert db.get_events(date='bad') == []
+    assert db.get_events(date='2025-13-40') == []
+    db.close()
+
+
+def test_get_events_date_query_uses_index(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    statements = []
+    db.get_connection().set_trace_callback(statements.append)
+    
+    db.get_events(date='2025-11-20')
+    db.get_connection().set_trace_callback(None)
+    
+    query = [sql for sql in statements if sql.lstrip().startswith('SELECT')][-1]
+    plan = db.get_connection().execute(f'EXPLAIN QUERY PLAN {query}').fetchall()
+    details = ' '.join(row[-1] for row in plan)
+    assert 'USING INDEX idx_start_utc_filters' in details
+    assert 'SCAN' not in details
+    db.close()
+
+
+def test_get_candidate_events_pushes_down_filters(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    db.insert_events([
+        make_event('Cosmic Disco', '2025-11-20T22:00:00'),
+        make_event('Jazz Brunch', '2025-11-20T12:00:00', neighborhood='Harlem'),
+        make_event('Jazz Night', '2025-11-20T21:00:00', neighborhood='Harlem', price_min=60.0),
+        make_event('Comedy Hour', '2025-11-20T21:30:00', neighborhood=None),
+        make_event('Techno Rave', '2025-11-20T23:00:00', raw_tags=['Techno', 'rave']),
+        make_event('Salsa Social', '2025-11-20T20:00:00', neighborhood='Chelsea'),
+    ])
+    
+    candidates = db.get_candidate_events(
+        '2025-11-20T18:00:00', '2025-11-21T04:00:00',
+        neighborhoods=['bushwick', 'harlem', ''],
+        max_price=50.0,
+        exclude_tags=['techno'],
+    )
+    assert [event['title'] for event in candidates] == ['Comedy Hour', 'Cosmic Disco']
+    
+    candidates = db.get_candidate_events(
+        '2025-11-20T18:00:00', '2025-11-21T04:00:00',
+        exclude_neighborhoods=['Chelsea', 'Bushwick'],
+    )
+    assert [event['title'] for event in candidates] == ['Jazz Night', 'Comedy Hour']
+    db.close()
+
+
+def test_tag_index_filters(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    db.insert_events([
+        make_event('Cosmic Disco', '2025-11-20T22:00:00', raw_tags=['Dance', 'disco']),
+        make_event('Techno Rave', '2025-11-20T23:00:00', raw_tags=['dance', 'techno']),
+        make_event('Jazz Night', '2025-11-20T21:00:00', raw_tags=['jazz', 'seated']),
+    ], mode='upsert')
+    
+    def titles(**filters):
+        return [event['title'] for event in db.get_events(date='2025-11-20', **filters)]
+    
+    assert titles(tags_any=['disco', 'JAZZ']) == ['Jazz Night', 'Cosmic Disco']
+    assert titles(tags_all=['dance', 'techno']) == ['Techno Rave']
+    
+    db.insert_events([
+        make_event('Jazz Night', '2025-11-20T21:00:00', raw_tags=['jazz', 'dance']),
+    ], mode='upsert')
+    assert titles(tags_any=['seated']) == []
+    assert titles(tags_all=['dance']) == ['Jazz Night', 'Cosmic Disco', 'Techno Rave']
+    
+    db.delete_old_events('2025-11-21T00:00:00')
+    assert db.get_connection().execute('SELECT COUNT(*) FROM event_tags').fetchone()[0] == 0
+    db.close()
+
+
+def test_event_cache_invalidates_on_ingest(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    cache = EventCache(db, max_entries=2, check_interval=0)
+    db.insert_event(make_event('Cosmic Disco', '2025-11-20T22:00:00'))
+    
+    first = cache.get_events(date='2025-11-20')
+    assert cache.get_events(date='2025-11-20') is first
+    assert cache.stats()['hits'] == 1
+    
+    db.insert_event(make_event('Techno Rave', '2025-11-20T23:00:00'))
+    assert [event['title'] for event in cache.get_events(date='2025-11-20')] == ['Cosmic Disco', 'Techno Rave']
+    
+    cache.get_events(date='2025-11-21')
+    cache.get_events(date='2025-11-22')
+    assert cache.stats()['entries'] == 2
+    db.close()
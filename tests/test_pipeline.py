@@ -5,11 +5,21 @@ Test script to verify the pipeline works with mock data
 
 import sys
 import os
+import threading
+import time
 from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from scraper import EventbriteScraper, HouseOfYesScraper, ShotgunScraper
 from utils.database import Database
+from pipeline import dedup
+from pipeline.dedup import fuzzy_deduplicate
+from pipeline.scheduler import Scheduler
+from pipeline.run_scrape import (run_all_scrapers, scrape_concurrently, stream_events, stream_all_scrapers,
+                                 store_stream, deduplicate_events)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
 
 
 def create_mock_events():
@@ -72,8 +82,8 @@ def create_mock_events():
     ]
     
     print("Adding mock events to database...")
-    inserted = db.insert_events(mock_events)
-    print(f"Inserted {inserted} mock events")
+    result = db.insert_events(mock_events)
+    print(f"Inserted {result['inserted']} mock events")
     
     print(f"\nTotal events in database: {db.get_event_count()}")
     
@@ -85,6 +95,430 @@ def create_mock_events():
     return db
 
 
+class SleepyScraper:
+    """Stand-in scraper that takes a fixed time to return one event"""
+    
+    def __init__(self, source_name, delay, fail=False):
+        self.source_name = source_name
+        self.delay = delay
+        self.fail = fail
+    
+    def scrape(self):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("site down")
+        return [{'title': 'Late Night', 'start_datetime': '2025-11-20T21:00:00',
+                 'venue_name': 'Shared Venue' if self.source_name != 'c' else 'Other', 'source_platform': self.source_name}]
+
+
+def test_scrapers_run_concurrently_with_deadlines():
+    scrapers = [SleepyScraper('a', 0.3), SleepyScraper('b', 0.1, fail=True),
+                SleepyScraper('c', 0.2), SleepyScraper('slow', 5)]
+    
+    started = time.monotonic()
+    results = scrape_concurrently(scrapers, timeout=0.5)
+    elapsed = time.monotonic() - started
+    
+    assert elapsed < 1.5
+    assert [r['source'] for r in results] == ['a', 'b', 'c', 'slow']
+    assert [len(r['events']) for r in results] == [1, 0, 1, 0]
+    assert results[1]['error'] == 'site down'
+    assert 'timed out' in results[3]['error']
+
+
+def test_run_all_scrapers_merges_in_scraper_order():
+    events = run_all_scrapers([SleepyScraper('b', 0.2), SleepyScraper('a', 0.0), SleepyScraper('c', 0.1)])
+    
+    assert [e['source_platform'] for e in events] == ['b', 'c']
+
+
+class CountingStreamScraper:
+    """Stand-in streaming scraper that records how many events it has produced"""
+    
+    def __init__(self, source_name, count):
+        self.source_name = source_name
+        self.count = count
+        self.produced = 0
+    
+    def iter_events(self):
+        for i in range(self.count):
+            self.produced += 1
+            yield {'title': f'Show {i}', 'start_datetime': '2025-11-20T21:00:00',
+                   'venue_name': 'Venue', 'source_platform': self.source_name}
+
+
+def test_stream_events_applies_backpressure():
+    scraper = CountingStreamScraper('a', 200)
+    results = []
+    
+    ahead = []
+    for consumed, event in enumerate(stream_events([scraper], queue_size=5, results=results), 1):
+        time.sleep(0.001)
+        ahead.append(scraper.produced - consumed)
+    
+    # The queue, the event being put and the one just handed over are all a producer can hold
+    assert max(ahead) <= 5 + 2
+    assert results == [{'source': 'a', 'count': 200, 'error': None, 'elapsed': results[0]['elapsed'],
+                        'future': results[0]['future']}]
+
+
+def test_stream_events_reports_failures_and_timeouts():
+    results = []
+    events = list(stream_events([SleepyScraper('b', 0.0, fail=True), SleepyScraper('c', 0.0),
+                                 SleepyScraper('slow', 5)], timeout=0.5, results=results))
+    
+    assert [e['source_platform'] for e in events] == ['c']
+    assert results[0]['error'] == 'site down'
+    assert results[1]['count'] == 1
+    assert 'timed out' in results[2]['error']
+
+
+def test_stream_all_scrapers_writes_in_batches(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    scraper = CountingStreamScraper('a', 25)
+    batches = []
+    insert_events = db.insert_events
+    
+    def recording_insert(events, **kwargs):
+        batches.append((len(events), scraper.produced))
+        return insert_events(events, **kwargs)
+    
+    db.insert_events = recording_insert
+    result = stream_all_scrapers(db, [scraper, SleepyScraper('b', 0.0), SleepyScraper('c', 0.0)],
+                                 queue_size=5, batch_size=10)
+    
+    assert result['inserted'] == 27
+    assert sum(size for size, _ in batches) == 27
+    assert max(size for size, _ in batches) == 10
+    assert batches[0][1] < 25
+    assert db.get_event_count() == 27
+
+
+def test_store_stream_flushes_partial_batches_while_the_stream_is_quiet(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    counts_while_quiet = []
+    
+    def quiet_stream():
+        yield from CountingStreamScraper('a', 2).iter_events()
+        time.sleep(0.5)
+        counts_while_quiet.append(db.get_event_count())
+        yield {'title': 'Encore', 'start_datetime': '2025-11-20T23:00:00',
+               'venue_name': 'Venue', 'source_platform': 'a'}
+    
+    result = store_stream(db, quiet_stream(), batch_size=100, flush_seconds=0.1)
+    
+    assert counts_while_quiet == [2]
+    assert result['inserted'] == 3
+
+
+def test_store_stream_records_fingerprints_only_for_written_rows(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    events = list(CountingStreamScraper('a', 3).iter_events())
+    # A value sqlite can't bind fails the batch, then just this row on retry
+    events[1]['price_min'] = {'amount': 10}
+    
+    result = store_stream(db, events)
+    
+    assert (result['inserted'], result['failed']) == (2, 1)
+    assert db.filter_unseen_events(events) == [events[1]]
+
+
+def test_stream_all_scrapers_skips_events_known_from_earlier_runs(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    first = stream_all_scrapers(db, [CountingStreamScraper('a', 5)])
+    again = stream_all_scrapers(db, [CountingStreamScraper('a', 6)])
+    
+    assert (first['inserted'], first['known']) == (5, 0)
+    assert (again['inserted'], again['ignored'], again['known']) == (1, 0, 5)
+    assert db.get_event_count() == 6
+
+
+class ListingScraper:
+    """Stand-in paged scraper over fixed pages of titles"""
+    
+    def __init__(self, source_name, pages):
+        self.source_name = source_name
+        self.pages = pages
+        self.known_page = None
+        self.crawl_complete = False
+        self.pages_fetched = 0
+    
+    def iter_events(self):
+        self.crawl_complete = False
+        day = (datetime.now() + timedelta(days=3)).strftime('%Y-%m-%d')
+        for titles in self.pages:
+            self.pages_fetched += 1
+            events = [{'title': title, 'start_datetime': f'{day}T21:00:00', 'venue_name': 'Venue',
+                       'source_platform': self.source_name} for title in titles]
+            yield from events
+            if self.known_page is not None and self.known_page(events):
+                return
+        self.crawl_complete = True
+
+
+def test_incremental_runs_stop_at_known_pages_and_tombstone_after_full_crawls(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    
+    first = ListingScraper('a', [['Alpha', 'Bravo'], ['Charlie']])
+    stream_all_scrapers(db, [first])
+    assert first.pages_fetched == 2
+    assert db.get_crawl_state('a')['last_full_crawl_at'] is not None
+    
+    # Page one is unchanged, so the new listing on page two waits for the next full crawl
+    second = ListingScraper('a', [['Alpha', 'Bravo'], ['Delta']])
+    result = stream_all_scrapers(db, [second])
+    assert second.pages_fetched == 1
+    assert (result['inserted'], result['removed']) == (0, 0)
+    
+    with db.transaction() as conn:
+        conn.execute("UPDATE crawl_state SET last_full_crawl_at = '2000-01-01T00:00:00'")
+    third = ListingScraper('a', [['Alpha'], ['Delta']])
+    result = stream_all_scrapers(db, [third])
+    assert third.pages_fetched == 2
+    assert (result['inserted'], result['removed']) == (1, 2)
+    assert sorted(e['title'] for e in db.get_events()) == ['Alpha', 'Delta']
+    
+    # A tombstoned event that is listed again comes back
+    result = stream_all_scrapers(db, [ListingScraper('a', [['Alpha', 'Bravo'], ['Delta']])])
+    assert result['updated'] == 1
+    assert sorted(e['title'] for e in db.get_events()) == ['Alpha', 'Bravo', 'Delta']
+
+
+def test_full_crawl_that_would_empty_a_source_tombstones_nothing(tmp_path, capsys):
+    db = Database(str(tmp_path / 'events.db'))
+    titles = [f'Show {i}' for i in range(20)]
+    stream_all_scrapers(db, [ListingScraper('a', [titles])])
+    
+    # A broken listing page that still parses two events
+    with db.transaction() as conn:
+        conn.execute("UPDATE crawl_state SET last_full_crawl_at = '2000-01-01T00:00:00'")
+    result = stream_all_scrapers(db, [ListingScraper('a', [titles[:2]])])
+    
+    assert result['removed'] == 0
+    assert 'would remove 18 of 20 upcoming events' in capsys.readouterr().out
+    assert len(db.get_events()) == 20
+    # Not a full crawl either, so the next run walks the whole listing again
+    assert db.get_crawl_state('a')['last_full_crawl_at'] == '2000-01-01T00:00:00'
+
+
+class BlockingScraper:
+    """Stand-in scraper that runs until released"""
+    
+    def __init__(self, source_name):
+        self.source_name = source_name
+        self.release = threading.Event()
+    
+    def iter_events(self):
+        self.release.wait(5)
+        yield {'title': 'Slow Show', 'start_datetime': '2025-11-20T21:00:00',
+               'venue_name': 'Venue', 'source_platform': self.source_name}
+
+
+def test_scheduler_runs_sources_on_their_own_intervals(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    now = [0.0]
+    slow = BlockingScraper('slow')
+    scheduler = Scheduler(db, [CountingStreamScraper('fast', 2), slow], intervals={'fast': 10, 'slow': 10},
+                          jitter=0, cleanup_interval=1000, clock=lambda: now[0])
+    
+    def step(at):
+        now[0] = at
+        started = scheduler.run_pending()
+        for job in scheduler.jobs:
+            if job.source == 'fast' and job.future:
+                job.future.result()
+        return started
+    
+    try:
+        assert step(0) == ['fast', 'slow']
+        assert step(5) == []
+        assert step(10) == ['fast']
+        slow.release.set()
+        scheduler.jobs[1].future.result()
+        assert step(20) == ['fast', 'slow']
+    finally:
+        slow.release.set()
+        scheduler.close()
+    
+    history = scheduler.history()
+    assert [(run['source'], run['status']) for run in reversed(history)][:3] == [
+        ('fast', 'ok'), ('slow', 'skipped'), ('fast', 'ok')
+    ]
+    # Re-runs reach the database and are recognized as unchanged, not dropped as duplicates
+    assert [(run['inserted'], run['known']) for run in scheduler.history('fast')] == [(0, 2), (0, 2), (2, 0)]
+    assert [run['status'] for run in scheduler.history('slow')] == ['ok', 'ok', 'skipped']
+
+
+def test_scheduler_skips_a_source_whose_timed_out_scraper_still_runs(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    now = [0.0]
+    slow = BlockingScraper('slow')
+    scheduler = Scheduler(db, [slow], intervals={'slow': 10}, jitter=0, timeout=0.2, cleanup_interval=1000,
+                          clock=lambda: now[0])
+    job = scheduler.jobs[0]
+    
+    def step(at):
+        now[0] = at
+        return scheduler.run_pending()
+    
+    try:
+        assert step(0) == ['slow']
+        assert 'timed out' in job.future.result()['error']
+        assert job.running
+        assert step(10) == []
+        
+        slow.release.set()
+        job.scraper_future.result()
+        assert step(20) == ['slow']
+        job.future.result()
+    finally:
+        slow.release.set()
+        scheduler.close()
+    
+    assert [run['status'] for run in scheduler.history()] == ['ok', 'skipped', 'error']
+
+
+class PricedScraper:
+    """Stand-in scraper listing one event at a price that can change between runs"""
+    
+    def __init__(self, source_name, price):
+        self.source_name = source_name
+        self.price = price
+    
+    def iter_events(self):
+        yield {'title': 'Cosmic Disco', 'start_datetime': '2025-11-20T22:00:00', 'venue_name': 'House of Yes',
+               'neighborhood': 'Bushwick', 'price_min': self.price, 'source_platform': self.source_name}
+
+
+def test_scheduler_reruns_upsert_changed_listings(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    now = [0.0]
+    scraper = PricedScraper('eventbrite', 10.0)
+    scheduler = Scheduler(db, [scraper], intervals={'eventbrite': 10}, jitter=0, cleanup_interval=1000,
+                          clock=lambda: now[0])
+    
+    try:
+        for at, price in [(0, 10.0), (10, 99.0)]:
+            now[0] = at
+            scraper.price = price
+            assert scheduler.run_pending() == ['eventbrite']
+            scheduler.jobs[0].future.result()
+    finally:
+        scheduler.close()
+    
+    assert [event['price_min'] for event in db.get_events()] == [99.0]
+    assert [run['updated'] for run in scheduler.history()] == [1, 0]
+
+
+class FixtureScraper:
+    """Stand-in scraper yielding events parsed from a fixture"""
+    
+    def __init__(self, source_name, events):
+        self.source_name = source_name
+        self.events = events
+    
+    def iter_events(self):
+        yield from self.events
+
+
+def test_scheduler_merges_listings_across_sources_run_separately(tmp_path):
+    db = Database(str(tmp_path / 'events.db'))
+    eventbrite = parse_fixture(EventbriteScraper, 'eventbrite.html', [
+        ('<h3>DJ Battle Royale #0</h3>', '<h3>DJ Battle Royale</h3>'),
+        ('Elsewhere, 599 Johnson Ave, Bushwick, Brooklyn', 'Brooklyn'),
+    ])
+    shotgun = parse_fixture(ShotgunScraper, 'shotgun.html', [
+        ('<h2>Food & Dining Pop-up #0</h2>', '<h2>DJ Battle Royale</h2>'),
+        ('House of Yes, 2 Wyckoff Ave, Bushwick', 'TBD'),
+    ])
+    scheduler = Scheduler(db, [FixtureScraper('eventbrite', eventbrite), FixtureScraper('shotgun', shotgun)],
+                          intervals={'eventbrite': 10, 'shotgun': 10}, jitter=0, cleanup_interval=1000,
+                          clock=lambda: 0.0)
+    
+    try:
+        assert scheduler.run_pending() == ['eventbrite', 'shotgun']
+        for job in scheduler.jobs:
+            job.future.result()
+    finally:
+        scheduler.close()
+    
+    titles = [event['title'] for event in db.get_events()]
+    assert titles.count('DJ Battle Royale') == 1
+    assert titles.count('Stand-up Comedy Hour #17') == 1
+    assert [run['status'] for run in scheduler.history()] == ['ok', 'ok']
+    
+    # Listings are forgotten once their day has passed
+    assert scheduler.fuzzy.prune('2025-11-21') > 0
+    assert min(listing.date for listing in scheduler.fuzzy.listings.values()) == '2025-11-21'
+
+
+def listing(title, venue, source, url, neighborhood='Bushwick', day='2025-11-20'):
+    return {'title': title, 'start_datetime': f'{day}T22:00:00', 'venue_name': venue,
+            'neighborhood': neighborhood, 'source_platform': source, 'url': url}
+
+
+def parse_fixture(scraper_class, name, replacements=()):
+    """Parse a scraper fixture, with its markup edited by (old, new) pairs"""
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        content = f.read()
+    for old, new in replacements:
+        assert old in content
+        content = content.replace(old, new, 1)
+    return scraper_class().parse_page(content.encode('utf-8'))
+
+
+def test_fuzzy_dedup_merges_cross_platform_listings():
+    # One night listed three ways: Eventbrite only knows the borough, Shotgun has
+    # neither venue nor neighborhood, and House of Yes lists it at its own venue
+    eventbrite = parse_fixture(EventbriteScraper, 'eventbrite.html', [
+        ('<h3>DJ Battle Royale #0</h3>', '<h3>DJ Battle Royale</h3>'),
+        ('Elsewhere, 599 Johnson Ave, Bushwick, Brooklyn', 'Brooklyn'),
+    ])
+    shotgun = parse_fixture(ShotgunScraper, 'shotgun.html', [
+        ('<h2>Food & Dining Pop-up #0</h2>', '<h2>DJ Battle Royale</h2>'),
+        ('House of Yes, 2 Wyckoff Ave, Bushwick', 'TBD'),
+    ])
+    house_of_yes = parse_fixture(HouseOfYesScraper, 'house_of_yes.html')
+    assert (eventbrite[0]['venue_name'], eventbrite[0]['neighborhood']) == ('TBD', 'Brooklyn')
+    assert (shotgun[0]['venue_name'], shotgun[0]['neighborhood']) == ('TBD', 'Manhattan')
+    events = eventbrite + shotgun + house_of_yes
+    
+    result = fuzzy_deduplicate(events)
+    
+    merged = [(m['url'].rsplit('/', 1)[1], m['canonical_url'].rsplit('/', 1)[1]) for m in result.merged]
+    assert merged == [
+        ('shotgun-0', 'event-0'),
+        # Cross-listings already in the fixtures; 17 and 28 have one side at TBD, Manhattan
+        ('shotgun-17', 'event-17'),
+        ('shotgun-22', 'event-22'),
+        ('shotgun-28', 'event-28'),
+        ('shotgun-29', 'event-29'),
+        ('0', 'event-0'),
+        ('7', 'event-0'),
+    ]
+    assert len(result.events) == len(events) - len(merged)
+    assert result.canonical[len(eventbrite)] == 0
+    assert len(deduplicate_events(events)) == len(events) - len(merged)
+    # The exact key only catches listings whose venue strings agree
+    assert len(deduplicate_events(events, fuzzy=False)) > len(events) - len(merged)
+
+
+def test_fuzzy_dedup_compares_only_within_blocks(monkeypatch):
+    comparisons = []
+    jaccard = dedup.jaccard
+    monkeypatch.setattr(dedup, 'jaccard', lambda a, b: comparisons.append(1) or jaccard(a, b))
+    
+    words = ['Disco', 'Techno', 'Jazz', 'Comedy', 'Burlesque', 'Salsa', 'Karaoke', 'Poetry']
+    events = [listing(f'{words[i % 8]} {words[i // 8 % 8]} Night', f'Venue {i % 50}', 'eventbrite', str(i),
+                      neighborhood=f'Hood {i % 10}', day=f'2025-11-{i % 28 + 1:02d}')
+              for i in range(5000)]
+    
+    fuzzy_deduplicate(events)
+    
+    # All pairs would be ~12.5M comparisons; blocking leaves a handful per event
+    assert len(comparisons) < 5 * len(events)
+
+
 if __name__ == '__main__':
     create_mock_events()
     print("\nMock data created successfully!")
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Tests for the night planner building blocks
+"""
+
+import sys
+import os
+import random
+import itertools
+from datetime import datetime, timedelta
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from planner.features import extract_features, parse_minute_of_day
+from planner.itinerary import ItineraryPlanner, DEFAULT_STAY_MINUTES, MAX_STAY_MINUTES
+from planner.scoring import CandidateTable, NightScorer
+from planner.selection import top_k, top_k_indices
+from planner.travel import TRAVEL_TIMES, TravelTimeMatrix
+from planner.venues import VENUES, TRAVEL_ESTIMATOR, VenueRegistry, haversine_km
+from utils.database import Database
+
+
+def reference_score(event, request, travel_time):
+    """
+    The original per-event plan-night-v2 heuristic, unchanged. The vectorized
+    scorer reproduces it except for time windows that wrap past midnight.
+    """
+    score = 50.0
+    reasons = []
+    
+    travel = travel_time((event.get('neighborhood') or '').lower())
+    if travel <= request['max_travel_minutes']:
+        score += 20
+        reasons.append(f"within {request['max_travel_minutes']} min travel")
+    elif travel <= request['max_travel_minutes'] + 15:
+        score += 10
+        reasons.append(f"slightly outside travel range ({travel} min)")
+    else:
+        score -= 20
+        reasons.append(f"far from home base ({travel} min)")
+    
+    title_lower = (event.get('title') or '').lower()
+    desc_lower = (event.get('description') or '').lower()
+    tags_lower = [t.lower() for t in event.get('raw_tags') or []]
+    intense_keywords = ['edm', 'rave', 'techno', 'bass', 'warehouse', 'club', 'dj']
+    seated_keywords = ['dinner', 'show', 'theater', 'burlesque', 'comedy', 'jazz', 'seated']
+    is_intense = any(kw in title_lower or kw in desc_lower or kw in tags_lower for kw in intense_keywords)
+    is_seated = any(kw in title_lower or kw in desc_lower or kw in tags_lower for kw in seated_keywords)
+    
+    if request['energy_level'] == 'low':
+        if is_seated:
+            score += 25
+            reasons.append("seated/show style (good for low energy)")
+        if is_intense:
+            score -= 30
+            reasons.append("too intense for low energy")
+        if request['wants_dinner'] and is_seated:
+            score += 15
+            reasons.append("dinner-friendly")
+    elif request['energy_level'] == 'medium':
+        if is_seated:
+            score += 10
+            reasons.append("good mix of seated and standing")
+        if is_intense:
+            score -= 10
+    elif request['energy_level'] == 'high':
+        if is_intense:
+            score += 25
+            reasons.append("high energy event")
+        if is_seated:
+            score -= 15
+            reasons.append("too seated for high energy")
+    
+    venue_lower = (event.get('venue_name') or '').lower()
+    if request['crowd_preference'] == '30_plus_preferred':
+        if any(v in venue_lower for v in ['house of yes', 'slipper room', 'jazz standard', 'blue note', 'village vanguard']):
+            score += 20
+            reasons.append("known for 30+ crowd")
+        elif 'college' in title_lower or 'student' in title_lower:
+            score -= 20
+            reasons.append("younger crowd")
+    
+    start_time_str = event.get('start_datetime', '')
+    try:
+        event_dt = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
+        event_time = event_dt.strftime('%H:%M')
+        
+        if request['start_time'] <= event_time <= request['end_time']:
+            score += 15
+            reasons.append("within your time window")
+        else:
+            score -= 10
+    except:
+        pass
+    
+    price_min = event.get('price_min')
+    if price_min is not None:
+        if price_min == 0:
+            score += 5
+            reasons.append("free event")
+        elif price_min < 20:
+            score += 3
+    
+    return score, reasons
+
+
+def random_events(count, seed=7):
+    rng = random.Random(seed)
+    titles = ['Techno Warehouse', 'Jazz Dinner', 'College Night', 'Comedy Show', 'Gallery Opening',
+              'Student DJ Battle', 'Burlesque Revue', 'Rooftop Party']
+    venues = ['Blue Note', 'House of Yes', 'Elsewhere', 'TBD', 'Slipper Room', None]
+    neighborhoods = ['Harlem', 'Bushwick', 'Chelsea', 'West Village', 'TBD', None, 'Queens']
+    tags = ['edm', 'seated', 'dance', 'art', 'dinner', 'Rave']
+    events = []
+    for i in range(count):
+        hour, minute = rng.randrange(24), rng.choice([0, 15, 30, 45])
+        events.append({
+            'title': f"{rng.choice(titles)} #{i}",
+            'description': rng.choice(['', 'bass heavy night', 'seated show with dinner', None]),
+            'start_datetime': rng.choice([f'2025-11-20T{hour:02d}:{minute:02d}:00', 'TBA']),
+            'venue_name': rng.choice(venues),
+            'neighborhood': rng.choice(neighborhoods),
+            'price_min': rng.choice([None, 0.0, 10.0, 19.99, 20.0, 45.0]),
+            'raw_tags': rng.sample(tags, rng.randrange(3)),
+        })
+    return events
+
+
+def test_extract_features():
+    features = extract_features({
+        'title': 'Student Night: Techno in the Basement',
+        'description': 'Late dinner before the party',
+        'start_datetime': '2025-11-20T21:30:00',
+        'venue_name': 'Blue Note Jazz Club',
+        'neighborhood': 'West Village',
+        'price_min': 0.0,
+        'raw_tags': ['Seated'],
+    })
+    
+    assert features.neighborhood == 'west village'
+    assert features.is_intense and features.is_seated
+    assert features.is_30_plus_venue and features.is_younger_crowd
+    assert features.start_minute == 21 * 60 + 30
+    assert features.price_min == 0.0
+
+
+def test_extract_features_handles_missing_fields():
+    features = extract_features({'title': 'Mystery Event', 'start_datetime': 'soon'})
+    
+    assert features.neighborhood == ''
+    assert not features.is_intense and not features.is_seated
+    assert features.start_minute is None
+    assert parse_minute_of_day('23:05') == 23 * 60 + 5
+    assert parse_minute_of_day('late') is None
+
+
+def reference_travel_time(neighborhood):
+    distances = {'harlem': 0, 'chelsea': 35, 'west village': 45, 'bushwick': 60}
+    if not neighborhood or neighborhood == 'tbd':
+        return 30
+    return distances.get(neighborhood, 35)
+
+
+def vectorized_scorer(request):
+    return NightScorer(estimate_travel=lambda t: t.map_neighborhoods(reference_travel_time), **request)
+
+
+def test_vectorized_scores_match_reference_heuristic():
+    events = random_events(400)
+    table = CandidateTable(events)
+    
+    requests = [
+        {'max_travel_minutes': 30, 'energy_level': 'low', 'wants_dinner': True,
+         'crowd_preference': '30_plus_preferred', 'start_time': '19:00', 'end_time': '23:00'},
+        {'max_travel_minutes': 20, 'energy_level': 'high', 'wants_dinner': False,
+         'crowd_preference': 'mixed_ok', 'start_time': '21:15', 'end_time': '23:59'},
+        {'max_travel_minutes': 45, 'energy_level': 'medium', 'wants_dinner': False,
+         'crowd_preference': 'no_preference', 'start_time': '20:00', 'end_time': '23:30'},
+    ]
+    for request in requests:
+        scorer = vectorized_scorer(request)
+        scores = scorer.score(table)
+        
+        for index, event in enumerate(events):
+            expected_score, expected_reasons = reference_score(event, request, reference_travel_time)
+            assert scores[index] == expected_score
+            assert scorer.reasons(table, index) == expected_reasons
+
+
+def test_time_window_wrapping_past_midnight_includes_late_starts():
+    events = random_events(400)
+    table = CandidateTable(events)
+    request = {'max_travel_minutes': 20, 'energy_level': 'high', 'wants_dinner': False,
+               'crowd_preference': 'mixed_ok', 'start_time': '22:00', 'end_time': '04:00'}
+    scorer = vectorized_scorer(request)
+    scores = scorer.score(table)
+    
+    # The original heuristic compared clock strings, so no start was ever inside 22:00-04:00
+    for index, event in enumerate(events):
+        expected_score, expected_reasons = reference_score(event, request, reference_travel_time)
+        reasons = scorer.reasons(table, index)
+        clock = event['start_datetime'][11:16]
+        if clock and (clock >= '22:00' or clock <= '04:00'):
+            assert scores[index] == expected_score + 25
+            reasons.remove("within your time window")
+        else:
+            assert scores[index] == expected_score
+        assert reasons == expected_reasons
+
+
+def test_top_k_matches_stable_sort():
+    rng = random.Random(3)
+    scores = np.array([rng.choice([10.0, 20.0, 35.0, 50.0, 65.0]) for _ in range(200)])
+    
+    for k in (0, 1, 10, 199, 200, 250):
+        expected = sorted(range(len(scores)), key=lambda i: -scores[i])[:k]
+        assert list(top_k_indices(scores, k)) == expected
+    
+    items = [('b', 2), ('a', 1), ('c', 2), ('d', 0)]
+    assert top_k(items, 2, key=lambda x: x[1]) == [('b', 2), ('c', 2)]
+    assert top_k(items, 3, key=lambda x: x[1], largest=False) == [('d', 0), ('a', 1), ('b', 2)]
+
+
+def test_travel_matrix_is_complete_and_consistent():
+    matrix = TRAVEL_TIMES.matrix
+    
+    assert (matrix == matrix.T).all()
+    assert (np.diag(matrix) == 0).all()
+    for k in range(len(matrix)):
+        assert (matrix <= matrix[:, k:k + 1] + matrix[k:k + 1, :]).all()
+    
+    assert TRAVEL_TIMES.travel_time('Harlem', 'Bushwick') == 60
+    assert TRAVEL_TIMES.travel_time('Harlem', 'West Village') == 45
+    assert TRAVEL_TIMES.travel_time('Bushwick', 'SoHo') == 40
+    assert TRAVEL_TIMES.travel_time('harlem', 'TBD') == 30
+    assert TRAVEL_TIMES.travel_time('Queens', 'Harlem') == 35
+
+
+def test_travel_matrix_fills_missing_pairs_with_shortest_paths():
+    matrix = TravelTimeMatrix({'a': {'b': 10}, 'b': {'c': 5}, 'c': {'a': 40}})
+    
+    assert matrix.travel_time('a', 'c') == 15
+    assert matrix.travel_time('c', 'a') == 15
+    assert matrix.neighborhood_filter('a', 12) == {'neighborhoods': ['a', 'b']}
+
+
+def test_venue_radius_queries_match_brute_force():
+    registry = VenueRegistry.load()
+    origin = registry.locate('East Village')
+    
+    for km in (0.5, 1.5, 4.0, 12.0):
+        expected = sorted(
+            (float(haversine_km(origin[0], origin[1], lat, lon)), name)
+            for name, (lat, lon) in registry.venues.items()
+        )
+        assert registry.venues_within_km('East Village', km) == [name for d, name in expected if d <= km]
+    
+    assert registry.venues_within_km('Atlantis', 5) == []
+    assert registry.radius_filter('Atlantis', 5) is None
+    assert registry.venues_within('East Village', 10, mode='walk') == registry.venues_within_km(
+        'East Village', 10 / 60 * 4.8 / 1.3
+    )
+
+
+def test_travel_estimates_prefer_venue_coordinates():
+    events = [
+        {'title': 'a', 'venue_name': 'House of Yes', 'neighborhood': 'Bushwick'},
+        {'title': 'b', 'venue_name': 'Somewhere New', 'neighborhood': 'Bushwick'},
+        {'title': 'c', 'venue_name': 'Somewhere New', 'neighborhood': 'Greenpoint'},
+        {'title': 'd', 'venue_name': 'Somewhere New', 'neighborhood': 'TBD'},
+    ]
+    table = CandidateTable(events, locate=VENUES.coordinates)
+    travel = TRAVEL_ESTIMATOR.from_origin('Harlem', table)
+    
+    assert list(table.is_venue_level) == [True, False, False, False]
+    assert list(table.has_coordinates) == [True, True, True, False]
+    assert travel[1] == TRAVEL_TIMES.travel_time('Harlem', 'Bushwick')
+    assert travel[3] == TRAVEL_TIMES.travel_time('Harlem', 'TBD')
+    assert 0 < travel[0] != travel[1]
+    assert 0 < travel[2] != TRAVEL_TIMES.travel_time('Harlem', 'Greenpoint')
+    
+    within = VENUES.radius_filter('East Village', 2.0)
+    assert not within(events[0])
+    assert within({'venue_name': 'Unknown', 'neighborhood': 'Lower East Side'})
+    assert within({'venue_name': 'Unknown', 'neighborhood': None})
+
+
+def test_neighborhood_prefilter_keeps_venues_reachable_by_coordinates():
+    events = [{'title': name, 'venue_name': name, 'neighborhood': neighborhood}
+              for name, neighborhood in VENUES.venue_neighborhoods.items()]
+    table = CandidateTable(events, locate=VENUES.coordinates)
+    travel = TRAVEL_ESTIMATOR.from_origin('Greenpoint', table)
+    
+    allowed = TRAVEL_ESTIMATOR.neighborhood_filter('Greenpoint', 30)['neighborhoods']
+    reachable = [event for event, minutes in zip(events, travel) if minutes <= 30]
+    
+    assert reachable
+    assert all(event['neighborhood'] in allowed for event in reachable)
+    assert TRAVEL_TIMES.neighborhood_filter('Greenpoint', 30) == {'neighborhoods': ['', 'tbd']}
+
+
+def test_candidate_query_keeps_reachable_venues_with_a_default_neighborhood(tmp_path):
+    # Scrapers file events at venues they can't place under 'Manhattan'
+    db = Database(str(tmp_path / 'events.db'))
+    events = [{'title': name, 'start_datetime': '2025-11-20T21:00:00', 'venue_name': name.title(),
+               'neighborhood': 'Manhattan', 'source_platform': 'test'} for name in VENUES.venues]
+    db.insert_events(events)
+    table = CandidateTable(events, locate=VENUES.coordinates)
+    travel = TRAVEL_ESTIMATOR.from_origin('Chelsea', table)
+    reachable = {event['title'] for event, minutes in zip(events, travel) if minutes <= 25}
+    
+    filters = TRAVEL_ESTIMATOR.neighborhood_filter('Chelsea', 25)
+    candidates = db.get_candidate_events('2025-11-20T00:00:00', '2025-11-21T00:00:00', **filters)
+    
+    assert 'blue note' in reachable
+    assert reachable <= {event['title'] for event in candidates}
+    db.close()
+
+
+def test_itinerary_matches_exhaustive_search():
+    events = random_events(60, seed=11)
+    rng = random.Random(5)
+    for event in events:
+        if event['start_datetime'] != 'TBA' and rng.random() < 0.7:
+            end = datetime.fromisoformat(event['start_datetime']) + timedelta(minutes=rng.choice([45, 90, 240]))
+            event['end_datetime'] = end.isoformat()
+    table = CandidateTable(events, locate=VENUES.coordinates)
+    scorer = NightScorer(estimate_travel=lambda t: TRAVEL_ESTIMATOR.from_origin('Chelsea', t),
+                         max_travel_minutes=40, energy_level='high')
+    scores = scorer.score(table)
+    home = scorer.travel_minutes(table)
+    
+    exhaustive = ItineraryPlanner(TRAVEL_ESTIMATOR.between, max_stops=3, max_leg_minutes=55, budget=50,
+                                  time_budget_ms=10000, max_predecessors=1000, labels_per_stop=100000)
+    rows = exhaustive.eligible(table, scores, home, None, None)
+    legs = TRAVEL_ESTIMATOR.between(table, rows)
+    start = table.start_at[rows]
+    end = np.where(np.isnan(table.end_at[rows]), start + DEFAULT_STAY_MINUTES,
+                   np.clip(table.end_at[rows], start, start + MAX_STAY_MINUTES))
+    price = np.nan_to_num(table.price_min[rows])
+    
+    best = 0.0
+    for size in (1, 2, 3):
+        for combo in itertools.combinations(range(len(rows)), size):
+            feasible = price[list(combo)].sum() <= 50 and all(
+                end[a] + legs[a, b] <= start[b] and legs[a, b] <= 55 for a, b in zip(combo, combo[1:])
+            )
+            if feasible:
+                best = max(best, scores[rows[list(combo)]].sum())
+    
+    plan = exhaustive.plan(table, scores, home)
+    assert plan.complete and len(plan.stops) > 1
+    assert plan.score == best
+    
+    pruned = ItineraryPlanner(TRAVEL_ESTIMATOR.between, max_stops=3, max_leg_minutes=55, budget=50).plan(
+        table, scores, home
+    )
+    assert pruned.complete and 0 < pruned.score <= best
+    stops = pruned.stops
+    assert all(table.start_at[a] < table.start_at[b] for a, b in zip(stops, stops[1:]))
+    assert np.nan_to_num(table.price_min[stops]).sum() <= 50
+
+
+def test_itinerary_returns_best_so_far_at_deadline():
+    events = random_events(200)
+    table = CandidateTable(events)
+    scorer = NightScorer(estimate_travel=lambda t: t.map_neighborhoods(lambda n: 10), max_travel_minutes=30,
+                         energy_level='medium')
+    scores = scorer.score(table)
+    
+    plan = ItineraryPlanner(lambda t, rows: np.full((len(rows), len(rows)), 10), time_budget_ms=0).plan(
+        table, scores, scorer.travel_minutes(table)
+    )
+    assert not plan.complete
+    assert len(plan.stops) == 1
+    assert plan.score == scores[plan.stops[0]] == scores[np.isfinite(table.start_at)].max()
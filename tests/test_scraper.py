@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared scraper HTTP layer
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scraper import EventbriteScraper, ShotgunScraper, ViewcyScraper, HouseOfYesScraper, SlipperRoomScraper
+from scraper import SourceSpec, SpecScraper, SOURCES
+from scraper.base_scraper import BaseScraper, PageResult
+from scraper.extraction import Selector, parse_html, text
+from scraper.parsing import ParserPool
+from scraper.http import HttpClient, TokenBucket
+from scraper.response_cache import ResponseCache
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def flaky_server():
+    """Local server answering 503 to the first request on each path, then 200"""
+    hits = {}
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] = hits.get(self.path, 0) + 1
+            status = 503 if hits[self.path] == 1 else 200
+            body = f"{self.headers.get('User-Agent')}".encode()
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_retries_and_reuses_session(flaky_server):
+    base_url, hits = flaky_server
+    client = HttpClient(requests_per_second=1000, backoff_factor=0)
+    
+    response = client.get(f"{base_url}/events")
+    assert response.status_code == 200
+    assert hits['/events'] == 2
+    assert response.text.startswith('Mozilla/5.0')
+    
+    session = client.session()
+    client.get(f"{base_url}/events?page=2")
+    assert client.session() is session
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+    
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    elapsed = time.monotonic() - started
+    
+    assert 0.15 <= elapsed < 0.6
+
+
+@pytest.fixture
+def listing_server():
+    """Local server with one ETag-validated page and one page without validators"""
+    requests_seen = []
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append((self.path, self.headers.get('If-None-Match')))
+            if self.path == '/etag' and self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = b'<div class="event"><h2>Cosmic Disco</h2></div>'
+            self.send_response(200)
+            if self.path == '/etag':
+                self.send_header('ETag', '"v1"')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+class CountingScraper(BaseScraper):
+    """Scraper that records how often it parses a page"""
+    
+    def __init__(self, cache):
+        super().__init__('test', http=HttpClient(requests_per_second=1000), cache=cache)
+        self.parses = 0
+    
+    def parse_page(self, content):
+        self.parses += 1
+        return [{'title': BeautifulSoup(content, 'html.parser').h2.get_text(), 'source_platform': self.source_name}]
+    
+    def scrape(self):
+        return []
+
+
+def test_unchanged_pages_skip_parsing(listing_server, tmp_path):
+    base_url, requests_seen = listing_server
+    scraper = CountingScraper(ResponseCache(str(tmp_path)))
+    
+    for path in ('/etag', '/plain'):
+        first = scraper.fetch_page(base_url + path, scraper.parse_page)
+        second = scraper.fetch_page(base_url + path, scraper.parse_page)
+        
+        assert not first.from_cache and second.from_cache
+        assert first.events == second.events == [{'title': 'Cosmic Disco', 'source_platform': 'test'}]
+    
+    assert scraper.parses == 2
+    assert requests_seen[1] == ('/etag', '"v1"')
+    
+    CountingScraper.PARSER_VERSION = 2
+    try:
+        result = scraper.fetch_page(base_url + '/etag', scraper.parse_page)
+    finally:
+        CountingScraper.PARSER_VERSION = 1
+    assert result.status_code == 304 and not result.from_cache
+    assert scraper.parses == 3
+
+
+class PagedScraper(BaseScraper):
+    """Scraper over a local listing whose pages run out after a few"""
+    
+    MAX_PAGES = 20
+    
+    def __init__(self, base_url, client):
+        super().__init__('paged', http=client, cache=None)
+        self.base_url = base_url
+    
+    def page_url(self, page):
+        return f"{self.base_url}/list?page={page}"
+    
+    def parse_page(self, content):
+        return [{'title': title} for title in content.decode().split()]
+    
+    def scrape(self):
+        return self.scrape_pages()
+
+
+def test_async_paging_stops_at_empty_page_and_bounds_concurrency():
+    active = {'now': 0, 'max': 0}
+    lock = threading.Lock()
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.05)
+            page = int(self.path.split('=')[1])
+            body = f"p{page}a p{page}b".encode() if page <= 7 else b''
+            with lock:
+                active['now'] -= 1
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = HttpClient(requests_per_second=1000, burst=100, max_connections_per_host=2)
+        scraper = PagedScraper(f"http://127.0.0.1:{server.server_address[1]}", client)
+        scraper.PAGE_WINDOW = 4
+        
+        events = scraper.scrape()
+        assert [e['title'] for e in events] == [f"p{page}{part}" for page in range(1, 8) for part in 'ab']
+        assert active['max'] == 2
+        assert scraper.crawl_complete
+        
+        assert len(asyncio.run(scraper.scrape_async(max_pages=3))) == 6
+        
+        scraper.known_page = lambda page_events: page_events[0]['title'] == 'p2a'
+        assert [e['title'] for e in scraper.iter_pages()] == ['p1a', 'p1b', 'p2a', 'p2b']
+        assert not scraper.crawl_complete
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_empty_or_cut_off_listings_are_not_complete_crawls():
+    class StubPagedScraper(PagedScraper):
+        def __init__(self, pages):
+            super().__init__('http://listing.invalid', HttpClient())
+            self.pages = pages
+        
+        def fetch_page(self, url, parse, timeout=15):
+            page = int(url.split('=')[1])
+            return PageResult(200, [{'title': title} for title in self.pages.get(page, [])], False)
+    
+    scraper = StubPagedScraper({})
+    assert scraper.scrape() == []
+    assert not scraper.crawl_complete
+    assert list(scraper.iter_pages()) == []
+    assert not scraper.crawl_complete
+    
+    scraper = StubPagedScraper({1: ['a'], 2: ['b']})
+    assert len(scraper.scrape()) == 2
+    assert scraper.crawl_complete
+    assert len(asyncio.run(scraper.scrape_async(max_pages=2))) == 2
+    assert not scraper.crawl_complete
+    assert len(list(scraper.iter_pages())) == 2
+    assert scraper.crawl_complete
+    
+    # A source listed on a single page is whole once that page has events
+    scraper = StubPagedScraper({1: ['a']})
+    scraper.MAX_PAGES = 1
+    assert len(scraper.scrape()) == 1
+    assert scraper.crawl_complete
+    assert len(list(scraper.iter_pages())) == 1
+    assert scraper.crawl_complete
+    scraper.pages = {}
+    assert list(scraper.iter_pages()) == []
+    assert not scraper.crawl_complete
+
+
+def test_paging_reuses_one_connection_pool_per_host():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def do_GET(self):
+            page = int(self.path.split('=')[1])
+            body = f"p{page}a".encode() if page <= 10 else b''
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = HttpClient(requests_per_second=1000, burst=100, max_connections=4)
+    try:
+        scraper = PagedScraper(f"http://127.0.0.1:{server.server_address[1]}", client)
+        assert len(scraper.scrape()) == 10
+        sessions = list(client._sessions)
+        assert len(list(scraper.iter_pages())) == 10
+        
+        assert client._sessions == sessions
+        assert len(sessions) <= 4
+        assert len(client.adapter.poolmanager.pools.keys()) == 1
+        
+        client.close()
+        assert not client._sessions
+        assert len(client.adapter.poolmanager.pools.keys()) == 0
+        assert len(scraper.scrape()) == 10
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_selector_matches_class_tokens_and_fallbacks():
+    root = parse_html(b'<ul><li class="card big"><b> A </b><i>x</i></li><li class="cards">B</li>'
+                      b'<li data-id="7"><a>no href</a><a href="/e/7">C</a></li></ul>')
+    
+    assert [text(li) for li in Selector('li.card').all(root)] == ['Ax']
+    assert [text(li) for li in Selector('div.card', 'li[data-id=7]').all(root)] == ['no hrefC']
+    assert Selector('a[href]').first(root).get('href') == '/e/7'
+    assert Selector('div', 'span.x').first(root) is None
+    assert Selector('li').all(parse_html(b'')) == []
+
+
+@pytest.mark.parametrize('scraper_class, fixture, count, first', [
+    (EventbriteScraper, 'eventbrite.html', 40,
+     {'title': 'DJ Battle Royale #0', 'venue_name': 'Elsewhere', 'price_min': 0.0,
+      'start_datetime': '2025-11-20T18:00:00', 'url': 'https://www.eventbrite.com/e/event-0'}),
+    (ShotgunScraper, 'shotgun.html', 36,
+     {'title': 'Food & Dining Pop-up #0', 'venue_name': 'House of Yes', 'price_min': 10.0,
+      'price_max': 45.0, 'url': 'https://shotgun.live/events/shotgun-0'}),
+    (ViewcyScraper, 'viewcy.html', 36,
+     {'title': 'Gallery Opening: New Work #0', 'raw_tags': ['nightlife', 'viewcy', 'nyc', 'art'],
+      'description': 'Event in New York City'}),
+    (HouseOfYesScraper, 'house_of_yes.html', 10,
+     {'title': 'DJ Battle Royale', 'description': 'DJ Battle Royale: an evening of performance, part 0.',
+      'url': 'https://www.houseofyes.org/events/0'}),
+    (SlipperRoomScraper, 'slipper_room.html', 10,
+     {'title': 'Jazz Dinner Show', 'price_min': 20.0, 'price_max': 40.0, 'neighborhood': 'Lower East Side'}),
+])
+def test_parse_page_fixtures(scraper_class, fixture, count, first):
+    events = scraper_class().parse_page(read_fixture(fixture))
+    
+    assert len(events) == count
+    assert {key: events[0][key] for key in first} == first
+    assert all(event['source_platform'] == scraper_class().source_name for event in events)
+
+
+def test_new_source_is_a_spec_entry():
+    spec = SourceSpec(
+        name='test_venue',
+        label='Test Venue',
+        base_url='https://example.com/shows',
+        link_base='https://example.com',
+        cards=Selector('li.show'),
+        title=Selector('h4'),
+        location=Selector('span.where'),
+        price=Selector('b'),
+        base_tags=('nightlife',),
+        tag_rules=(('jazz', ('jazz', 'swing')),),
+    )
+    page = (b'<ul><li class="show"><h4>Late Swing Set</h4><time datetime="2025-11-20T23:00:00"></time>'
+            b'<span class="where">Smalls, 183 W 10th St, West Village</span><b>$20 - $35</b>'
+            b'<a href="/s/1">go</a></li><li class="show"><h4>No date</h4></li></ul>')
+    
+    events = SpecScraper(spec, cache=None).parse_page(page)
+    
+    assert events == [{
+        'title': 'Late Swing Set', 'description': 'Event in New York City',
+        'start_datetime': '2025-11-20T23:00:00', 'end_datetime': None,
+        'venue_name': 'Smalls', 'neighborhood': 'West Village', 'city': 'New York',
+        'price_min': 20.0, 'price_max': 35.0, 'url': 'https://example.com/s/1',
+        'raw_tags': ['nightlife', 'jazz'], 'source_platform': 'test_venue',
+    }]
+    assert sorted(SOURCES) == ['eventbrite', 'house_of_yes', 'posh', 'shotgun', 'slipper_room', 'viewcy']
+
+
+def test_parser_pool_matches_in_process_parsing():
+    custom = SourceSpec(name='custom', label='Custom', base_url='https://example.com', link_base='https://example.com',
+                        cards=Selector('div.event'), title=Selector('h2'), start_required=False)
+    
+    with ParserPool(2) as pool:
+        assert pool.warm() >= 1
+        for scraper_class, fixture in [(ShotgunScraper, 'shotgun.html'), (HouseOfYesScraper, 'house_of_yes.html')]:
+            scraper = scraper_class(cache=None)
+            content = read_fixture(fixture)
+            expected = scraper.parse_page(content)
+            
+            scraper.parser_pool = pool
+            assert scraper.run_parser(scraper.parse_page, content) == expected
+        
+        remote = pool.parse(custom, read_fixture('house_of_yes.html'))
+        assert [e['title'] for e in remote] == [e['title'] for e in SpecScraper(custom).parse_page(
+            read_fixture('house_of_yes.html'))]
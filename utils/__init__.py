@@ -1,3 +1,4 @@
 from .database import Database
+from .event_cache import EventCache
 
-__all__ = ['Database']
+__all__ = ['Database', 'EventCache']
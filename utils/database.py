@@ -1,39 +1,247 @@
 import sqlite3
 import json
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import hashlib
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
+from datetime import datetime, timedelta
 import os
+import pytz
+
+
+# Applied to every pooled connection. journal_mode is persistent in the
+# database file, the rest are per-connection settings.
+CONNECTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+
+# Naive event times from the scrapers are local NYC wall-clock times
+LOCAL_TIMEZONE = pytz.timezone('America/New_York')
+
+# start_utc is stored in SQLite's own datetime format so it sorts and compares as text
+UTC_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# A complete crawl that would tombstone more than this fraction of a source's
+# upcoming events is held back, as a broken listing more likely than a cancellation
+MAX_TOMBSTONE_FRACTION = 0.5
+# Crawls tombstoning no more than this many events are never held back
+TOMBSTONE_GUARD_MIN_EVENTS = 10
+
+# Errors caused by one row's values; anything else fails the whole write
+ROW_ERRORS = (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError, sqlite3.DataError)
+
+EVENT_INSERT_COLUMNS = '''
+    (title, description, start_datetime, start_utc, end_datetime, venue_name, neighborhood,
+     city, price_min, price_max, url, source_platform, raw_tags, created_at,
+     content_hash, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Fields that make up an event's content; a change in any of them is
+# written back by upsert mode, as is any listing of a tombstoned event.
+CONTENT_HASH_FIELDS = (
+    'description', 'end_datetime', 'neighborhood', 'city',
+    'price_min', 'price_max', 'url', 'raw_tags',
+)
+
+INSERT_SQL = {
+    'ignore': 'INSERT OR IGNORE INTO events' + EVENT_INSERT_COLUMNS,
+    'upsert': 'INSERT INTO events' + EVENT_INSERT_COLUMNS + '''
+        ON CONFLICT(title, start_datetime, venue_name) DO UPDATE SET
+            description = excluded.description,
+            end_datetime = excluded.end_datetime,
+            neighborhood = excluded.neighborhood,
+            city = excluded.city,
+            price_min = excluded.price_min,
+            price_max = excluded.price_max,
+            url = excluded.url,
+            raw_tags = excluded.raw_tags,
+            content_hash = excluded.content_hash,
+            updated_at = excluded.updated_at,
+            removed_at = NULL
+        WHERE (events.content_hash IS NOT excluded.content_hash OR events.removed_at IS NOT NULL)
+          AND events.source_platform = excluded.source_platform
+    ''',
+}
+
+
+def to_utc_timestamp(value: Union[str, datetime, None]) -> Optional[str]:
+    """
+    Normalize an ISO datetime string or datetime to a sortable UTC timestamp.
+    Naive values are interpreted as LOCAL_TIMEZONE. Returns None if the value can't be parsed.
+    """
+    if not value:
+        return None
+    
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    
+    if value.tzinfo is None:
+        value = LOCAL_TIMEZONE.localize(value)
+    
+    return value.astimezone(pytz.utc).strftime(UTC_TIMESTAMP_FORMAT)
+
+
+def local_day_bounds(date: str) -> Tuple[str, str]:
+    """Return the half-open [start, end) UTC timestamp range covering a local calendar date"""
+    day = datetime.fromisoformat(date[:10])
+    return to_utc_timestamp(day), to_utc_timestamp(day + timedelta(days=1))
+
+
+def event_identity(event: Dict[str, Any]) -> Tuple[str, str, str]:
+    """
+    What makes two listings the same event: normalized title, start date and venue.
+    In-run dedup and the fingerprint index both key on it, so they agree on what
+    counts as already seen.
+    """
+    title = (event.get('title') or '').lower().strip()
+    
+    start_datetime = event.get('start_datetime') or ''
+    date_part = start_datetime.split('T')[0] if 'T' in start_datetime else start_datetime[:10]
+    
+    venue = (event.get('venue_name') or '').lower().strip()
+    
+    return (title, date_part, venue)
+
+
+def event_fingerprint(event: Dict[str, Any]) -> str:
+    """Stable hash of an event's identity"""
+    return hashlib.sha1(json.dumps(event_identity(event)).encode('utf-8')).hexdigest()
+
+
+def content_hash(event: Dict[str, Any]) -> str:
+    """Hash of the CONTENT_HASH_FIELDS of an event"""
+    raw_tags = json.dumps(event.get('raw_tags', []))
+    content = [raw_tags if field == 'raw_tags' else event.get(field) for field in CONTENT_HASH_FIELDS]
+    return hashlib.sha1(json.dumps(content).encode('utf-8')).hexdigest()
+
+
+def fingerprint_hash(event: Dict[str, Any]) -> str:
+    """
+    Everything a rewrite of a known event could change: its content and its exact
+    start time, which the identity only keeps to the day
+    """
+    return hashlib.sha1(json.dumps([event.get('start_datetime'), content_hash(event)]).encode('utf-8')).hexdigest()
+
+
+# Body of the event_tags sync triggers: one lowercase row per tag of the NEW event
+TAG_ROWS_SQL = '''
+    INSERT OR IGNORE INTO event_tags (event_id, tag)
+    SELECT NEW.id, lower(trim(value)) FROM json_each(COALESCE(NEW.raw_tags, '[]'))
+    WHERE trim(value) != ''
+'''
 
 
 class Database:
     """SQLite database manager for events"""
     
-    def __init__(self, db_path: str = './data/events.db'):
+    def __init__(self, db_path: str = './data/events.db', pragmas: Optional[Dict[str, Any]] = None):
         self.db_path = db_path
+        self.pragmas = dict(CONNECTION_PRAGMAS, **(pragmas or {}))
+        self._local = threading.local()
+        self._connections = []
+        self._pool_lock = threading.Lock()
+        self._generation = 0
         self._ensure_data_directory()
         self.init_database()
     
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def _ensure_data_directory(self):
         """Ensure the data directory exists"""
         data_dir = os.path.dirname(self.db_path)
         if data_dir and not os.path.exists(data_dir):
             os.makedirs(data_dir)
     
-    def get_connection(self):
-        """Get a database connection"""
-        return sqlite3.connect(self.db_path)
+    def get_connection(self) -> sqlite3.Connection:
+        """
+        Get the pooled connection for the calling thread.
+        Connections are opened lazily, one per thread, and stay open until the
+        thread ends or close() is called.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.generation == self._generation:
+            return conn
+        
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        
+        with self._pool_lock:
+            self._connections.append(conn)
+            self._local.conn = conn
+            self._local.generation = self._generation
+        # Pipeline runs start fresh threads, so each one's connection goes with it
+        weakref.finalize(threading.current_thread(), self._release, conn)
+        return conn
     
-    def init_database(self):
-        """Initialize the database schema"""
+    def _release(self, conn: sqlite3.Connection):
+        """Close a pooled connection whose thread has ended"""
+        with self._pool_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block inside a single write transaction on the pooled connection.
+        The write lock is taken up front (BEGIN IMMEDIATE): a deferred transaction
+        that reads before it writes fails with SQLITE_BUSY_SNAPSHOT when another
+        connection committed in between, which busy_timeout can't wait out.
+        """
         conn = self.get_connection()
-        cursor = conn.cursor()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+    
+    def close(self):
+        """Close every pooled connection. The database can still be used afterwards."""
+        with self._pool_lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
         
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+    
+    def init_database(self):
+        """Initialize the database schema"""
+        with self.transaction() as conn:
+            self._create_schema(conn.cursor())
+    
+    def _create_schema(self, cursor: sqlite3.Cursor):
+        """Create tables and indexes"""
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS events (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 title TEXT NOT NULL,
                 description TEXT,
                 start_datetime TEXT NOT NULL,
+                start_utc TEXT,
                 end_datetime TEXT,
                 venue_name TEXT,
                 neighborhood TEXT,
@@ -44,76 +252,574 @@ class Database:
                 source_platform TEXT NOT NULL,
                 raw_tags TEXT,
                 created_at TEXT NOT NULL,
+                content_hash TEXT,
+                updated_at TEXT,
+                removed_at TEXT,
                 UNIQUE(title, start_datetime, venue_name)
             )
         ''')
+        self._add_missing_columns(cursor, 'events', {
+            'content_hash': 'TEXT',
+            'updated_at': 'TEXT',
+            'start_utc': 'TEXT',
+            'removed_at': 'TEXT',
+        })
         
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_start_datetime ON events(start_datetime)')
+        # Covers the planner's candidate filters so rejected rows never touch the table
+        cursor.execute('DROP INDEX IF EXISTS idx_start_utc')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_start_utc_filters
+            ON events(start_utc, neighborhood COLLATE NOCASE, price_min)
+        ''')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_venue_name ON events(venue_name)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_neighborhood ON events(neighborhood)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_city ON events(city)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_source_platform ON events(source_platform)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_raw_tags ON events(raw_tags)')
+        # Tag lookups go through event_tags; an index over the JSON text can't answer them
+        cursor.execute('DROP INDEX IF EXISTS idx_raw_tags')
+        
+        self._create_tag_schema(cursor)
+        self._backfill_start_utc(cursor)
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS metadata (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO metadata (key, value) VALUES ('data_version', 0)")
+        
+        # One row per event identity seen by the pipeline, with a hash of what was
+        # last written for it, so unchanged events are dropped before any write
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS event_fingerprints (
+                fingerprint TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                event_date TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_fingerprints_date ON event_fingerprints(event_date)')
+        
+        self._create_crawl_schema(cursor)
+    
+    def _create_crawl_schema(self, cursor: sqlite3.Cursor):
+        """
+        Per-source crawl state: when each source was last crawled, every listing
+        it showed, stamped with the run that last saw it, and a log of runs.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_state (
+                source TEXT PRIMARY KEY,
+                last_run_at TEXT NOT NULL,
+                last_success_at TEXT,
+                last_full_crawl_at TEXT,
+                events_seen INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS source_listings (
+                source TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                title TEXT NOT NULL,
+                start_datetime TEXT NOT NULL,
+                venue_name TEXT,
+                url TEXT,
+                last_seen TEXT NOT NULL,
+                PRIMARY KEY (source, fingerprint)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scrape_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                finished_at TEXT NOT NULL,
+                status TEXT NOT NULL,
+                events_seen INTEGER NOT NULL DEFAULT 0,
+                inserted INTEGER NOT NULL DEFAULT 0,
+                updated INTEGER NOT NULL DEFAULT 0,
+                known INTEGER NOT NULL DEFAULT 0,
+                removed INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_scrape_runs_source ON scrape_runs(source, started_at)')
+    
+    def _create_tag_schema(self, cursor: sqlite3.Cursor):
+        """
+        Create the normalized event_tags table. Triggers keep it in sync with
+        events.raw_tags on every insert, update and delete.
+        """
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'event_tags'"
+        ).fetchone()
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS event_tags (
+                event_id INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (event_id, tag)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_tags_tag ON event_tags(tag, event_id)')
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_events_tags_insert AFTER INSERT ON events
+            BEGIN
+                {TAG_ROWS_SQL};
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_events_tags_update AFTER UPDATE OF raw_tags ON events
+            BEGIN
+                DELETE FROM event_tags WHERE event_id = OLD.id;
+                {TAG_ROWS_SQL};
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_events_tags_delete AFTER DELETE ON events
+            BEGIN
+                DELETE FROM event_tags WHERE event_id = OLD.id;
+            END
+        ''')
         
-        conn.commit()
-        conn.close()
+        if not exists:
+            cursor.execute('''
+                INSERT OR IGNORE INTO event_tags (event_id, tag)
+                SELECT events.id, lower(trim(json_each.value))
+                FROM events, json_each(events.raw_tags)
+                WHERE events.raw_tags IS NOT NULL AND trim(json_each.value) != ''
+            ''')
+    
+    def _backfill_start_utc(self, cursor: sqlite3.Cursor):
+        """Fill start_utc for rows written before the column existed"""
+        rows = cursor.execute('SELECT id, start_datetime FROM events WHERE start_utc IS NULL').fetchall()
+        updates = [(to_utc_timestamp(start), event_id) for event_id, start in rows]
+        cursor.executemany('UPDATE events SET start_utc = ? WHERE id = ?',
+                           [update for update in updates if update[0]])
+    
+    def _add_missing_columns(self, cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]):
+        """Add columns introduced after a database file was first created"""
+        existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+        for name, column_type in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {column_type}')
     
     def insert_event(self, event: Dict[str, Any]) -> bool:
         """Insert a single event into the database"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        return self.insert_events([event])['inserted'] > 0
+    
+    def insert_events(self, events: List[Dict[str, Any]], chunk_size: Optional[int] = None,
+                      mode: str = 'ignore') -> Dict[str, Any]:
+        """
+        Insert multiple events into the database.
+        Each chunk (the whole batch by default) is written with executemany in a single
+        transaction. Returns inserted/updated/ignored/failed counts, overall and per source_platform,
+        and under failed_keys the event_fingerprint of every event that could not be written.
+        
+        mode='ignore' leaves already stored events untouched. mode='upsert' rewrites a stored
+        event from the same source when its content hash changed, and skips it otherwise.
+        """
+        if mode not in INSERT_SQL:
+            raise ValueError(f"Unknown insert mode: {mode}")
+        
+        result = {'inserted': 0, 'updated': 0, 'ignored': 0, 'failed': 0, 'by_source': {}, 'failed_keys': []}
+        if not events:
+            return result
         
+        chunk_size = chunk_size or len(events)
+        created_at = datetime.now().isoformat()
+        
+        for offset in range(0, len(events), chunk_size):
+            rows_by_source = {}
+            events_by_source = {}
+            for event in events[offset:offset + chunk_size]:
+                source = event.get('source_platform') or 'unknown'
+                counts = result['by_source'].setdefault(
+                    source, {'inserted': 0, 'updated': 0, 'ignored': 0, 'failed': 0}
+                )
+                try:
+                    row = self._event_row(event, created_at)
+                except (TypeError, ValueError) as e:
+                    print(f"Error inserting event: {e}")
+                    counts['failed'] += 1
+                    result['failed_keys'].append(event_fingerprint(event))
+                    continue
+                rows_by_source.setdefault(source, []).append(row)
+                events_by_source.setdefault(source, []).append(event)
+            
+            with self.transaction() as conn:
+                written = 0
+                for source, rows in rows_by_source.items():
+                    inserted, updated, failed = self._insert_rows(conn, INSERT_SQL[mode], rows)
+                    counts = result['by_source'][source]
+                    counts['inserted'] += inserted
+                    counts['updated'] += updated
+                    counts['failed'] += len(failed)
+                    counts['ignored'] += len(rows) - inserted - updated - len(failed)
+                    result['failed_keys'].extend(event_fingerprint(events_by_source[source][index])
+                                                 for index in failed)
+                    written += inserted + updated
+                
+                if written:
+                    self._bump_data_version(conn)
+        
+        for counts in result['by_source'].values():
+            for key in ('inserted', 'updated', 'ignored', 'failed'):
+                result[key] += counts[key]
+        
+        return result
+    
+    def _event_row(self, event: Dict[str, Any], created_at: str) -> tuple:
+        """Convert an event dict into an events table row"""
+        for field in ('title', 'start_datetime', 'source_platform'):
+            if not event.get(field):
+                raise ValueError(f"missing {field} for event {event.get('title')!r}")
+        
+        raw_tags = json.dumps(event.get('raw_tags', []))
+        
+        return (
+            event.get('title'),
+            event.get('description'),
+            event.get('start_datetime'),
+            to_utc_timestamp(event.get('start_datetime')),
+            event.get('end_datetime'),
+            event.get('venue_name'),
+            event.get('neighborhood'),
+            event.get('city'),
+            event.get('price_min'),
+            event.get('price_max'),
+            event.get('url'),
+            event.get('source_platform'),
+            raw_tags,
+            created_at,
+            content_hash(event),
+            created_at
+        )
+    
+    def _insert_rows(self, conn: sqlite3.Connection, sql: str, rows: List[tuple]) -> tuple:
+        """
+        Write rows inside the current transaction and return (inserted, updated, failed),
+        failed being the indices of the rows that could not be written.
+        If the batch statement fails on a bad row, it is rolled back and retried
+        row by row so that row does not take down the rest of the batch. Errors
+        that aren't about a row, such as a locked database, are raised.
+        """
+        # ids are AUTOINCREMENT, so rows created by this call are exactly those above max_id
+        max_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+        
+        conn.execute('SAVEPOINT insert_rows')
         try:
-            cursor.execute('''
-                INSERT OR IGNORE INTO events 
-                (title, description, start_datetime, end_datetime, venue_name, neighborhood, 
-                 city, price_min, price_max, url, source_platform, raw_tags, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                event.get('title'),
-                event.get('description'),
-                event.get('start_datetime'),
-                event.get('end_datetime'),
-                event.get('venue_name'),
-                event.get('neighborhood'),
-                event.get('city'),
-                event.get('price_min'),
-                event.get('price_max'),
-                event.get('url'),
-                event.get('source_platform'),
-                json.dumps(event.get('raw_tags', [])),
-                datetime.now().isoformat()
-            ))
+            written = conn.executemany(sql, rows).rowcount
+            conn.execute('RELEASE insert_rows')
+            failed = []
+        except ROW_ERRORS:
+            conn.execute('ROLLBACK TO insert_rows')
+            conn.execute('RELEASE insert_rows')
             
-            conn.commit()
-            return cursor.rowcount > 0
-        except Exception as e:
-            print(f"Error inserting event: {e}")
-            return False
-        finally:
-            conn.close()
+            written = 0
+            failed = []
+            for index, row in enumerate(rows):
+                try:
+                    written += conn.execute(sql, row).rowcount
+                except ROW_ERRORS as e:
+                    print(f"Error inserting event: {e}")
+                    failed.append(index)
+        
+        inserted = conn.execute('SELECT COUNT(*) FROM events WHERE id > ?', (max_id,)).fetchone()[0]
+        return inserted, written - inserted, failed
+    
+    def filter_unseen_events(self, events: List[Dict[str, Any]], chunk_size: int = 500) -> List[Dict[str, Any]]:
+        """
+        Drop events a previous run already recorded with the same content and start
+        time. New events and events that changed since are returned in order.
+        """
+        fingerprints = [event_fingerprint(event) for event in events]
+        known = {}
+        
+        conn = self.get_connection()
+        for offset in range(0, len(fingerprints), chunk_size):
+            chunk = fingerprints[offset:offset + chunk_size]
+            placeholders = ', '.join('?' * len(chunk))
+            known.update(conn.execute(
+                f'SELECT fingerprint, content_hash FROM event_fingerprints WHERE fingerprint IN ({placeholders})',
+                chunk
+            ).fetchall())
+        
+        return [event for event, fingerprint in zip(events, fingerprints)
+                if known.get(fingerprint) != fingerprint_hash(event)]
+    
+    def record_fingerprints(self, events: List[Dict[str, Any]]):
+        """Remember events as seen, so later runs can skip them while they stay unchanged"""
+        seen_at = datetime.now().isoformat()
+        rows = [(event_fingerprint(event), fingerprint_hash(event), event_identity(event)[1], seen_at)
+                for event in events if event.get('title') and event.get('start_datetime')]
+        if not rows:
+            return
+        
+        with self.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO event_fingerprints (fingerprint, content_hash, event_date, last_seen)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(fingerprint) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    last_seen = excluded.last_seen
+            ''', rows)
+    
+    def get_crawl_state(self, source: str) -> Optional[Dict[str, Any]]:
+        """Crawl bookkeeping for a source, or None if it was never crawled"""
+        cursor = self.get_connection().execute('SELECT * FROM crawl_state WHERE source = ?', (source,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([desc[0] for desc in cursor.description], row))
+    
+    def known_listings(self, source: str, events: List[Dict[str, Any]]) -> Set[str]:
+        """Fingerprints among events that an earlier crawl of source already listed"""
+        fingerprints = sorted({event_fingerprint(event) for event in events})
+        if not fingerprints:
+            return set()
+        
+        placeholders = ', '.join('?' * len(fingerprints))
+        rows = self.get_connection().execute(
+            f'SELECT fingerprint FROM source_listings WHERE source = ? AND fingerprint IN ({placeholders})',
+            [source] + fingerprints
+        ).fetchall()
+        return {row[0] for row in rows}
+    
+    def mark_listings_seen(self, source: str, events: List[Dict[str, Any]], seen_at: str):
+        """Record that source listed these events in the crawl started at seen_at"""
+        rows = [(source, event_fingerprint(event), event['title'], event['start_datetime'],
+                 event.get('venue_name'), event.get('url'), seen_at)
+                for event in events if event.get('title') and event.get('start_datetime')]
+        if not rows:
+            return
+        
+        with self.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO source_listings (source, fingerprint, title, start_datetime, venue_name, url, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(source, fingerprint) DO UPDATE SET
+                    title = excluded.title,
+                    start_datetime = excluded.start_datetime,
+                    venue_name = excluded.venue_name,
+                    url = excluded.url,
+                    last_seen = excluded.last_seen
+            ''', rows)
+    
+    def finish_crawl(self, source: str, started_at: str, success: bool, complete: bool,
+                     events_seen: int = 0) -> int:
+        """
+        Record a crawl of source that started at started_at. After a successful,
+        complete crawl, upcoming events the source no longer lists are tombstoned:
+        marked removed_at and hidden from queries, and their fingerprints dropped
+        so they are written again if they come back. Returns the number tombstoned.
+        
+        A crawl that would tombstone more than MAX_TOMBSTONE_FRACTION of the
+        source's upcoming events removes nothing and isn't counted as a full crawl.
+        """
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT INTO crawl_state (source, last_run_at, events_seen) VALUES (?, ?, ?)
+                ON CONFLICT(source) DO UPDATE SET
+                    last_run_at = excluded.last_run_at,
+                    events_seen = excluded.events_seen
+            ''', (source, started_at, events_seen))
+            if not success:
+                return 0
+            
+            conn.execute('UPDATE crawl_state SET last_success_at = ? WHERE source = ?', (started_at, source))
+            if not complete:
+                return 0
+            
+            gone = conn.execute(
+                'SELECT fingerprint, title, start_datetime, venue_name FROM source_listings '
+                'WHERE source = ? AND last_seen < ?',
+                (source, started_at)
+            ).fetchall()
+            now = to_utc_timestamp(datetime.now(pytz.utc))
+            live = conn.execute(
+                'SELECT COUNT(*) FROM events WHERE source_platform = ? AND removed_at IS NULL AND start_utc >= ?',
+                (source, now)
+            ).fetchone()[0]
+            
+            conn.execute('SAVEPOINT tombstone')
+            removed = 0
+            if gone:
+                removed = conn.executemany('''
+                    UPDATE events SET removed_at = ?
+                    WHERE source_platform = ? AND title = ? AND start_datetime = ? AND venue_name IS ?
+                      AND removed_at IS NULL AND start_utc >= ?
+                ''', [(started_at, source, row[1], row[2], row[3], now) for row in gone]).rowcount
+            if removed > max(TOMBSTONE_GUARD_MIN_EVENTS, MAX_TOMBSTONE_FRACTION * live):
+                conn.execute('ROLLBACK TO tombstone')
+                conn.execute('RELEASE tombstone')
+                print(f"Warning: crawl of {source} would remove {removed} of {live} upcoming events, skipping")
+                return 0
+            conn.execute('RELEASE tombstone')
+            
+            conn.execute('UPDATE crawl_state SET last_full_crawl_at = ? WHERE source = ?', (started_at, source))
+            conn.execute('DELETE FROM source_listings WHERE source = ? AND last_seen < ?', (source, started_at))
+            conn.executemany('DELETE FROM event_fingerprints WHERE fingerprint = ?',
+                             [(row[0],) for row in gone])
+            
+            if removed:
+                self._bump_data_version(conn)
+            return removed
+    
+    def record_scrape_run(self, run: Dict[str, Any]):
+        """Append a run of one source to the scrape_runs log"""
+        counts = ('events_seen', 'inserted', 'updated', 'known', 'removed')
+        columns = ('source', 'started_at', 'finished_at', 'status', 'error') + counts
+        with self.transaction() as conn:
+            conn.execute(
+                f'INSERT INTO scrape_runs ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+                [run.get(column, 0 if column in counts else None) for column in columns]
+            )
+    
+    def get_scrape_runs(self, source: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent scrape runs first, optionally for one source"""
+        query = 'SELECT * FROM scrape_runs'
+        params: List[Any] = []
+        if source:
+            query += ' WHERE source = ?'
+            params.append(source)
+        query += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit)
+        
+        cursor = self.get_connection().execute(query, params)
+        columns = [desc[0] for desc in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def get_events(self, date: Optional[str] = None, limit: Optional[int] = None,
+                   tags_any: Optional[List[str]] = None,
+                   tags_all: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get events from the database, optionally limited to one local calendar date
+        and to events carrying any / all of the given tags (case-insensitive).
+        A date that isn't YYYY-MM-DD matches no events.
+        """
+        conditions, params = self._tag_conditions(tags_any=tags_any, tags_all=tags_all)
+        
+        if date:
+            try:
+                start, end = local_day_bounds(date)
+            except ValueError:
+                return []
+            conditions.insert(0, 'start_utc >= ? AND start_utc < ?')
+            params[:0] = [start, end]
+        
+        return self._query_events(' AND '.join(conditions), params, limit)
     
-    def insert_events(self, events: List[Dict[str, Any]]) -> int:
-        """Insert multiple events into the database"""
-        count = 0
-        for event in events:
-            if self.insert_event(event):
-                count += 1
-        return count
+    def get_events_between(self, start: Union[str, datetime], end: Union[str, datetime],
+                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get events starting in the half-open range [start, end). Naive values are local time."""
+        return self._query_events(
+            'start_utc >= ? AND start_utc < ?',
+            [to_utc_timestamp(start), to_utc_timestamp(end)],
+            limit
+        )
     
-    def get_events(self, date: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get events from the database"""
+    def get_candidate_events(self, start: Union[str, datetime], end: Union[str, datetime],
+                             neighborhoods: Optional[List[str]] = None,
+                             exclude_neighborhoods: Optional[List[str]] = None,
+                             venues: Optional[List[str]] = None,
+                             max_price: Optional[float] = None,
+                             exclude_tags: Optional[List[str]] = None,
+                             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get events starting in [start, end) that satisfy the planner's constraints.
+        Neighborhood and tag matching is case-insensitive; an empty string in a
+        neighborhood list stands for events without a neighborhood.
+        Events at one of venues pass the neighborhood constraints whatever their
+        neighborhood. Events with an unknown price are kept under a max_price ceiling.
+        """
+        conditions = ['start_utc >= ? AND start_utc < ?']
+        params = [to_utc_timestamp(start), to_utc_timestamp(end)]
+        
+        place_conditions = []
+        place_params = []
+        if neighborhoods is not None:
+            names = sorted({name.lower() for name in neighborhoods})
+            placeholders = ', '.join('?' * len(names))
+            clause = f'neighborhood COLLATE NOCASE IN ({placeholders})'
+            if '' in names:
+                clause = f'({clause} OR neighborhood IS NULL)'
+            place_conditions.append(clause)
+            place_params.extend(names)
+        
+        if exclude_neighborhoods:
+            names = sorted({name.lower() for name in exclude_neighborhoods})
+            placeholders = ', '.join('?' * len(names))
+            null_clause = 'neighborhood IS NOT NULL AND' if '' in names else 'neighborhood IS NULL OR'
+            place_conditions.append(f'({null_clause} neighborhood COLLATE NOCASE NOT IN ({placeholders}))')
+            place_params.extend(names)
+        
+        if place_conditions and venues:
+            names = sorted({name.lower() for name in venues})
+            placeholders = ', '.join('?' * len(names))
+            place_conditions = [
+                f'({" AND ".join(place_conditions)} OR venue_name COLLATE NOCASE IN ({placeholders}))'
+            ]
+            place_params.extend(names)
+        conditions.extend(place_conditions)
+        params.extend(place_params)
+        
+        if max_price is not None:
+            conditions.append('(price_min IS NULL OR price_min <= ?)')
+            params.append(max_price)
+        
+        tag_conditions, tag_params = self._tag_conditions(exclude_tags=exclude_tags)
+        conditions.extend(tag_conditions)
+        params.extend(tag_params)
+        
+        return self._query_events(' AND '.join(conditions), params, limit)
+    
+    def _tag_conditions(self, tags_any: Optional[List[str]] = None, tags_all: Optional[List[str]] = None,
+                        exclude_tags: Optional[List[str]] = None) -> Tuple[List[str], List[Any]]:
+        """Build WHERE conditions that answer tag filters from the event_tags index"""
+        conditions = []
+        params = []
+        
+        if tags_any:
+            tags = sorted({tag.lower() for tag in tags_any})
+            placeholders = ', '.join('?' * len(tags))
+            conditions.append(f'id IN (SELECT event_id FROM event_tags WHERE tag IN ({placeholders}))')
+            params.extend(tags)
+        
+        if tags_all:
+            tags = sorted({tag.lower() for tag in tags_all})
+            placeholders = ', '.join('?' * len(tags))
+            conditions.append(
+                f'id IN (SELECT event_id FROM event_tags WHERE tag IN ({placeholders}) '
+                'GROUP BY event_id HAVING COUNT(*) = ?)'
+            )
+            params.extend(tags)
+            params.append(len(tags))
+        
+        if exclude_tags:
+            tags = sorted({tag.lower() for tag in exclude_tags})
+            placeholders = ', '.join('?' * len(tags))
+            conditions.append(f'id NOT IN (SELECT event_id FROM event_tags WHERE tag IN ({placeholders}))')
+            params.extend(tags)
+        
+        return conditions, params
+    
+    def _query_events(self, where: Optional[str], params: List[Any], limit: Optional[int]) -> List[Dict[str, Any]]:
+        """Run an events SELECT ordered by start time and decode the rows"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        query = 'SELECT * FROM events'
-        params = []
+        # Tombstoned events are kept until they age out but are never served
+        query = 'SELECT * FROM events WHERE removed_at IS NULL'
+        params = list(params)
         
-        if date:
-            query += ' WHERE date(start_datetime) = date(?)'
-            params.append(date)
+        if where:
+            query += f' AND {where}'
         
-        query += ' ORDER BY start_datetime'
+        query += ' ORDER BY start_utc'
         
         if limit:
             query += ' LIMIT ?'
@@ -130,21 +836,33 @@ class Database:
                 event['raw_tags'] = json.loads(event['raw_tags'])
             events.append(event)
         
-        conn.close()
         return events
     
-    def delete_old_events(self, cutoff_date: str) -> int:
+    def delete_old_events(self, cutoff_date: Union[str, datetime]) -> int:
         """Delete events older than the cutoff date"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM events WHERE start_datetime < ?', (cutoff_date,))
-        deleted_count = cursor.rowcount
-        
-        conn.commit()
-        conn.close()
-        
-        return deleted_count
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                'DELETE FROM events WHERE start_utc < ? OR (start_utc IS NULL AND start_datetime < ?)',
+                (to_utc_timestamp(cutoff_date), str(cutoff_date))
+            )
+            conn.execute('DELETE FROM event_fingerprints WHERE event_date < ?', (str(cutoff_date)[:10],))
+            if cursor.rowcount:
+                self._bump_data_version(conn)
+            return cursor.rowcount
+    
+    def get_data_version(self) -> int:
+        """
+        Get the data version counter. It is bumped by every write that changes
+        events, so readers can tell when cached query results are stale.
+        """
+        row = self.get_connection().execute(
+            "SELECT value FROM metadata WHERE key = 'data_version'"
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def _bump_data_version(self, conn: sqlite3.Connection):
+        """Increment the data version inside the caller's transaction"""
+        conn.execute("UPDATE metadata SET value = value + 1 WHERE key = 'data_version'")
     
     def get_event_count(self) -> int:
         """Get total number of events in database"""
@@ -152,17 +870,11 @@ class Database:
         cursor = conn.cursor()
         
         cursor.execute('SELECT COUNT(*) FROM events')
-        count = cursor.fetchone()[0]
-        
-        conn.close()
-        return count
+        return cursor.fetchone()[0]
     
     def clear_all_events(self):
         """Clear all events from the database"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM events')
-        
-        conn.commit()
-        conn.close()
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM events')
+            conn.execute('DELETE FROM event_fingerprints')
+            self._bump_data_version(conn)
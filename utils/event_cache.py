@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from .database import Database
+
+
+class EventCache:
+    """
+    In-process read-through LRU cache for event queries.
+    
+    Entries are keyed by query (date first) and bounded both by entry count and by the
+    total number of cached events. The whole cache is dropped whenever the database's
+    data version changes, i.e. after the pipeline inserts or deletes events.
+    Cached lists are shared between callers and must be treated as read-only.
+    """
+    
+    def __init__(self, db: Database, max_entries: int = 64, max_events: int = 50000,
+                 check_interval: float = 1.0):
+        self.db = db
+        self.max_entries = max_entries
+        self.max_events = max_events
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._event_total = 0
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_events(self, date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Cached Database.get_events for one date"""
+        return self.get(('events', date), lambda: self.db.get_events(date=date))
+    
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader() on a miss.
+        The size of a value is its len(), counted against max_events.
+        """
+        version = self._current_version()
+        
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        
+        value = loader()
+        
+        with self._lock:
+            if version == self._version and key not in self._entries and len(value) <= self.max_events:
+                self._entries[key] = value
+                self._event_total += len(value)
+                self._evict()
+        
+        return value
+    
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._event_total = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """Cache counters for monitoring"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'events': self._event_total,
+                'hits': self.hits,
+                'misses': self.misses,
+                'data_version': self._version,
+            }
+    
+    def _current_version(self) -> Optional[int]:
+        """Re-read the data version at most once per check_interval, clearing on change"""
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < self.check_interval:
+            return self._version
+        
+        version = self.db.get_data_version()
+        with self._lock:
+            self._checked_at = now
+            if version != self._version:
+                self._entries.clear()
+                self._event_total = 0
+                self._version = version
+        return version
+    
+    def _evict(self):
+        """Evict least recently used entries until both bounds hold"""
+        while len(self._entries) > self.max_entries or self._event_total > self.max_events:
+            _, value = self._entries.popitem(last=False)
+            self._event_total -= len(value)